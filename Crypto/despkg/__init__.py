@@ -1 +1,4 @@
-from .cipher import DesCipherFile, DesCipher
\ No newline at end of file
+from .cipher import DesCipherFile, DesCipher
+from .schedule import DesKeySchedule, get_key_schedule, schedule_cache_info, clear_schedule_cache
+from .stream import DesStreamEncryptor, DesStreamDecryptor, encrypt_file, decrypt_file
+from .parallel import ParallelDesCipher, get_parallel_cipher
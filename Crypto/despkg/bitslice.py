@@ -0,0 +1,144 @@
+"""Bitsliced DES: many independent blocks evaluated in lockstep.
+
+The input blocks are transposed into 64 bit-planes; plane j holds bit j+1 of
+every block, one block per lane. Planes are Python big ints (lane i is the
+i-th most significant bit), or NumPy uint64 arrays if BITSLICE_BACKEND is
+"numpy" (measured slower than big ints, whose bitwise ops are already a single
+C loop per gate, so it is opt-in).
+In this form IP, E, P and FP are free (they only reorder planes), key bits
+become "invert the plane or not", and each S-box is a boolean circuit of
+AND/XOR gates, derived at import time from its algebraic normal form, applied
+to all lanes at once by a single big-int (or vector) operation per gate.
+"""
+from typing import List, Sequence
+from .tables import IP, FP, E, P, SBOXES
+
+try:
+    import numpy as np
+except ImportError:  # optional, the big-int backend needs nothing
+    np = None
+
+# Blocks per batch; bigger batches amortize the per-gate interpreter overhead
+# further at the cost of memory (~ 200 live planes of LANES bits each).
+BITSLICE_LANES = 16384
+BITSLICE_BACKEND = "int"  # "int" or "numpy"
+
+def _sbox_anf(sbox: List[List[int]]) -> List[List[int]]:
+    """For each of the 4 output bits, the monomials (6-bit input masks) of its ANF.
+
+    Input bit b1 (the row MSB) is mask bit 5, b6 is mask bit 0, as in the DES
+    6-bit input value.
+    """
+    outputs = []
+    for bit in range(4):
+        truth = []
+        for x in range(64):
+            row = ((x >> 4) & 2) | (x & 1)
+            col = (x >> 1) & 0xF
+            truth.append((sbox[row][col] >> (3 - bit)) & 1)
+        # Moebius transform: truth table -> ANF coefficients
+        step = 1
+        while step < 64:
+            for x in range(64):
+                if x & step:
+                    truth[x] ^= truth[x ^ step]
+            step <<= 1
+        outputs.append([m for m in range(64) if truth[m]])
+    return outputs
+
+SBOX_ANF = [_sbox_anf(sbox) for sbox in SBOXES]
+
+def _sbox_eval(anf: List[List[int]], ins: Sequence, ones) -> list:
+    """Evaluate one S-box circuit; `ins` are the 6 input planes (b1..b6)."""
+    mono = [ones] * 64  # monomial 0 is the constant 1
+    for p in range(6):
+        mono[1 << p] = ins[5 - p]
+    for m in range(3, 64):
+        low = m & -m
+        if m != low:
+            mono[m] = mono[m ^ low] & mono[low]
+    out = []
+    for terms in anf:
+        acc = mono[terms[0]]
+        for m in terms[1:]:
+            acc = acc ^ mono[m]
+        out.append(acc)
+    return out
+
+def _rounds(planes: list, subkeys: Sequence[int], ones) -> list:
+    """16 DES rounds over 64 bit-planes (IP and FP included)."""
+    block = [planes[i - 1] for i in IP]
+    L, R = block[:32], block[32:]
+    for k in subkeys:
+        er = [R[i - 1] for i in E]
+        x = [p ^ ones if (k >> (47 - i)) & 1 else p for i, p in enumerate(er)]
+        s_out = []
+        for j in range(8):
+            s_out.extend(_sbox_eval(SBOX_ANF[j], x[6 * j:6 * j + 6], ones))
+        L, R = R, [l ^ s_out[i - 1] for l, i in zip(L, P)]
+    pre = R + L
+    return [pre[i - 1] for i in FP]
+
+# ---------------- big-int backend ----------------
+# bit `b` (0 = MSB) of a byte -> ASCII '1' / '0', so a byte column becomes a binary literal
+_TO_BINARY = [bytes(0x31 if (v >> (7 - b)) & 1 else 0x30 for v in range(256)) for b in range(8)]
+_FROM_BINARY = bytes(1 if v == 0x31 else 0 for v in range(256))
+
+def _to_planes_int(data: bytes, lanes: int) -> List[int]:
+    planes = []
+    for byte_idx in range(8):
+        column = data[byte_idx::8]
+        for b in range(8):
+            planes.append(int(column.translate(_TO_BINARY[b]), 2))
+    return planes
+
+def _from_planes_int(planes: List[int], lanes: int) -> bytes:
+    out = bytearray(lanes * 8)
+    fmt = f"0{lanes}b"
+    for byte_idx in range(8):
+        acc = 0
+        for b in range(8):
+            bits = format(planes[8 * byte_idx + b], fmt).encode("ascii").translate(_FROM_BINARY)
+            acc |= int.from_bytes(bits, "big") << (7 - b)
+        out[byte_idx::8] = acc.to_bytes(lanes, "big")
+    return bytes(out)
+
+def _crypt_int(data: bytes, subkeys: Sequence[int]) -> bytes:
+    lanes = len(data) // 8
+    ones = (1 << lanes) - 1
+    return _from_planes_int(_rounds(_to_planes_int(data, lanes), subkeys, ones), lanes)
+
+# ---------------- NumPy backend ----------------
+def _crypt_numpy(data: bytes, subkeys: Sequence[int]) -> bytes:
+    lanes = len(data) // 8
+    bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8).reshape(lanes, 8), axis=1)
+    packed = np.packbits(bits.T, axis=1)  # (64, ceil(lanes / 8))
+    pad = -packed.shape[1] % 8
+    if pad:
+        packed = np.pad(packed, ((0, 0), (0, pad)))
+    words = np.ascontiguousarray(packed).view(np.uint64)
+    ones = np.uint64(0xFFFFFFFFFFFFFFFF)
+    out = np.stack(_rounds(list(words), subkeys, ones))
+    out_bits = np.unpackbits(out.view(np.uint8), axis=1)[:, :lanes]
+    return np.packbits(out_bits.T, axis=1).tobytes()
+
+def _crypt(data: bytes, subkeys: Sequence[int]) -> bytes:
+    if len(data) % 8 != 0:
+        raise ValueError("Data length must be multiple of 8")
+    if not data:
+        return b""
+    crypt = _crypt_numpy if BITSLICE_BACKEND == "numpy" and np is not None else _crypt_int
+    blocks = len(data) // 8
+    # equal-sized batches, so the last one is not a nearly empty (but full-cost) batch
+    batches = -(-blocks // BITSLICE_LANES)
+    step = -(-blocks // batches) * 8
+    return b"".join(crypt(data[i:i + step], subkeys) for i in range(0, len(data), step))
+
+def des_blocks_encrypt_bitslice(data: bytes, subkeys: Sequence[int]) -> bytes:
+    """Encrypt every 8-byte block of `data` independently (raw ECB, no padding).
+    `subkeys` are the 48-bit int round keys of the int engine."""
+    return _crypt(data, subkeys)
+
+def des_blocks_decrypt_bitslice(data: bytes, subkeys: Sequence[int]) -> bytes:
+    """Decrypt every 8-byte block of `data` independently (raw ECB, no padding)."""
+    return _crypt(data, subkeys[::-1])
@@ -0,0 +1,138 @@
+"""Table-driven DES core working on integers.
+
+Same algorithm as `block.py`, but blocks never leave integer form. Because the
+E expansion only copies bits, E(L ^ f) == E(L) ^ E(f), so both halves are kept
+in their 48-bit expanded form for all 16 rounds:
+- IP is applied with byte-indexed tables that directly yield E(L0) and E(R0),
+- S-boxes, P and E are fused into 4 "SP" tables indexed by two 6-bit groups,
+- FP is applied with tables indexed by the same 12-bit group pairs.
+Subkeys are the standard 48-bit round keys stored as ints. All tables are
+derived at import time from `tables.py`.
+"""
+from typing import List, Sequence
+from .tables import IP, FP, E, P, SBOXES
+from .bits import bytes_to_bits, permute, int_to_bits
+from .block import generate_subkeys_from_key64
+
+_MASK48 = (1 << 48) - 1
+
+def _bits_to_int(bits: Sequence[int]) -> int:
+    return int("".join(map(str, bits)), 2) if bits else 0
+
+def _expand(x32: int) -> int:
+    return _bits_to_int(permute(int_to_bits(x32, 32), E))
+
+def _byte_tables(table: List[int], width: int) -> List[List[int]]:
+    """For each input byte position and byte value, the output contribution of `table`."""
+    out = []
+    for byte_idx in range(width // 8):
+        row = []
+        for value in range(256):
+            acc = 0
+            for i, src in enumerate(table):
+                pos = src - 1
+                if pos // 8 == byte_idx and (value >> (7 - pos % 8)) & 1:
+                    acc |= 1 << (len(table) - 1 - i)
+            row.append(acc)
+        out.append(row)
+    return out
+
+def _ip_tables() -> List[List[int]]:
+    """IP followed by E on each half: entries are E(L) << 48 | E(R)."""
+    return [[(_expand(v >> 32) << 48) | _expand(v & 0xFFFFFFFF) for v in row]
+            for row in _byte_tables(IP, 64)]
+
+def _sp_tables() -> List[List[int]]:
+    """SP[j][x]: S-boxes 2j and 2j+1 on the 12-bit input x, then P, then E."""
+    single = []
+    for j in range(8):
+        row = []
+        for x in range(64):
+            r = ((x >> 4) & 2) | (x & 1)
+            c = (x >> 1) & 0xF
+            s_out = [0] * 32
+            s_out[4 * j:4 * j + 4] = int_to_bits(SBOXES[j][r][c], 4)
+            row.append(_expand(_bits_to_int(permute(s_out, P))))
+        single.append(row)
+    return [[single[2 * j][x >> 6] | single[2 * j + 1][x & 63] for x in range(4096)]
+            for j in range(4)]
+
+def _fp_tables() -> List[List[int]]:
+    """FP over R||L, indexed by 12-bit group pairs of the expanded halves."""
+    # the middle 4 bits of each 6-bit group are the original (unexpanded) bits
+    contract = [(((x >> 7) & 0xF) << 4) | ((x >> 1) & 0xF) for x in range(4096)]
+    fp = _byte_tables(FP, 64)
+    return [[fp[byte_idx][contract[x]] for x in range(4096)] for byte_idx in range(8)]
+
+IP_TABLES = _ip_tables()
+SP_TABLES = _sp_tables()
+FP_TABLES = _fp_tables()
+
+def generate_subkeys_int(key: bytes) -> List[int]:
+    """Build the 16 round keys (48-bit ints) for an 8-byte DES key."""
+    if len(key) != 8:
+        raise ValueError("DES key must be 8 bytes")
+    return [_bits_to_int(k) for k in generate_subkeys_from_key64(bytes_to_bits(key))]
+
+def _crypt_blocks(data: bytes, subkeys: Sequence[int]) -> bytes:
+    """Run the 16 rounds over every 8-byte block of `data` (length must be a multiple of 8)."""
+    ip0, ip1, ip2, ip3, ip4, ip5, ip6, ip7 = IP_TABLES
+    sp0, sp1, sp2, sp3 = SP_TABLES
+    fp0, fp1, fp2, fp3, fp4, fp5, fp6, fp7 = FP_TABLES
+    k0, k1, k2, k3, k4, k5, k6, k7, k8, k9, k10, k11, k12, k13, k14, k15 = subkeys
+    out = bytearray()
+    for i in range(0, len(data), 8):
+        x = (ip0[data[i]] | ip1[data[i + 1]] | ip2[data[i + 2]] | ip3[data[i + 3]] |
+             ip4[data[i + 4]] | ip5[data[i + 5]] | ip6[data[i + 6]] | ip7[data[i + 7]])
+        L = x >> 48
+        R = x & _MASK48
+        # unrolled rounds; halves are updated in place, so no swap is needed
+        t = R ^ k0
+        L ^= sp0[t >> 36] | sp1[(t >> 24) & 0xFFF] | sp2[(t >> 12) & 0xFFF] | sp3[t & 0xFFF]
+        t = L ^ k1
+        R ^= sp0[t >> 36] | sp1[(t >> 24) & 0xFFF] | sp2[(t >> 12) & 0xFFF] | sp3[t & 0xFFF]
+        t = R ^ k2
+        L ^= sp0[t >> 36] | sp1[(t >> 24) & 0xFFF] | sp2[(t >> 12) & 0xFFF] | sp3[t & 0xFFF]
+        t = L ^ k3
+        R ^= sp0[t >> 36] | sp1[(t >> 24) & 0xFFF] | sp2[(t >> 12) & 0xFFF] | sp3[t & 0xFFF]
+        t = R ^ k4
+        L ^= sp0[t >> 36] | sp1[(t >> 24) & 0xFFF] | sp2[(t >> 12) & 0xFFF] | sp3[t & 0xFFF]
+        t = L ^ k5
+        R ^= sp0[t >> 36] | sp1[(t >> 24) & 0xFFF] | sp2[(t >> 12) & 0xFFF] | sp3[t & 0xFFF]
+        t = R ^ k6
+        L ^= sp0[t >> 36] | sp1[(t >> 24) & 0xFFF] | sp2[(t >> 12) & 0xFFF] | sp3[t & 0xFFF]
+        t = L ^ k7
+        R ^= sp0[t >> 36] | sp1[(t >> 24) & 0xFFF] | sp2[(t >> 12) & 0xFFF] | sp3[t & 0xFFF]
+        t = R ^ k8
+        L ^= sp0[t >> 36] | sp1[(t >> 24) & 0xFFF] | sp2[(t >> 12) & 0xFFF] | sp3[t & 0xFFF]
+        t = L ^ k9
+        R ^= sp0[t >> 36] | sp1[(t >> 24) & 0xFFF] | sp2[(t >> 12) & 0xFFF] | sp3[t & 0xFFF]
+        t = R ^ k10
+        L ^= sp0[t >> 36] | sp1[(t >> 24) & 0xFFF] | sp2[(t >> 12) & 0xFFF] | sp3[t & 0xFFF]
+        t = L ^ k11
+        R ^= sp0[t >> 36] | sp1[(t >> 24) & 0xFFF] | sp2[(t >> 12) & 0xFFF] | sp3[t & 0xFFF]
+        t = R ^ k12
+        L ^= sp0[t >> 36] | sp1[(t >> 24) & 0xFFF] | sp2[(t >> 12) & 0xFFF] | sp3[t & 0xFFF]
+        t = L ^ k13
+        R ^= sp0[t >> 36] | sp1[(t >> 24) & 0xFFF] | sp2[(t >> 12) & 0xFFF] | sp3[t & 0xFFF]
+        t = R ^ k14
+        L ^= sp0[t >> 36] | sp1[(t >> 24) & 0xFFF] | sp2[(t >> 12) & 0xFFF] | sp3[t & 0xFFF]
+        t = L ^ k15
+        R ^= sp0[t >> 36] | sp1[(t >> 24) & 0xFFF] | sp2[(t >> 12) & 0xFFF] | sp3[t & 0xFFF]
+        out += (fp0[R >> 36] | fp1[(R >> 24) & 0xFFF] | fp2[(R >> 12) & 0xFFF] | fp3[R & 0xFFF] |
+                fp4[L >> 36] | fp5[(L >> 24) & 0xFFF] | fp6[(L >> 12) & 0xFFF] | fp7[L & 0xFFF]).to_bytes(8, "big")
+    return bytes(out)
+
+def des_blocks_encrypt_int(data: bytes, subkeys: Sequence[int]) -> bytes:
+    """Encrypt every 8-byte block of `data` independently (raw ECB, no padding)."""
+    return _crypt_blocks(data, subkeys)
+
+def des_blocks_decrypt_int(data: bytes, subkeys: Sequence[int]) -> bytes:
+    """Decrypt every 8-byte block of `data` independently (raw ECB, no padding)."""
+    return _crypt_blocks(data, subkeys[::-1])
+
+def des_block_encrypt_int(block8: bytes, subkeys: Sequence[int]) -> bytes:
+    return _crypt_blocks(block8, subkeys)
+
+def des_block_decrypt_int(block8: bytes, subkeys: Sequence[int]) -> bytes:
+    return _crypt_blocks(block8, subkeys[::-1])
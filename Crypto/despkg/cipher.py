@@ -1,8 +1,11 @@
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Union
 from dataclasses import dataclass
-from .bits import hex_to_bytes_clean
-from .block import generate_subkeys_from_key64
-from .modes import ecb_encrypt, ecb_decrypt, cbc_encrypt, cbc_decrypt
+from .bits import hex_to_bytes_clean, bytes_to_hex_spaced
+from .schedule import DesKeySchedule
+from .modes import (ecb_encrypt, ecb_decrypt, cbc_encrypt, cbc_decrypt, ctr_encrypt, ctr_decrypt, ctr_crypt_at,
+                    make_subkeys, DEFAULT_ENGINE)
+from .stream import encrypt_file, decrypt_file, DEFAULT_CHUNK_SIZE
+from .parallel import get_parallel_cipher
 
 class DesCipherFile:
     def __init__(self, path_file: str, path_key: str, path_iv: Optional[str] = None) -> None:
@@ -11,16 +14,59 @@ class DesCipherFile:
         self.path_iv = path_iv
 
     @staticmethod
-    def _load_key_bits(path_key: str):
+    def _load_key(path_key: str) -> bytes:
         with open(path_key, "r", encoding="utf-8") as f:
             key_hex = f.read().strip()
         key = hex_to_bytes_clean(key_hex)
         if len(key) != 8:
             raise ValueError("DES key must be 8 bytes (16 hex chars).")
-        # chuyển sang bit mảng:
-        return [ (byte >> (7 - i)) & 1 for byte in key for i in range(8) ]
+        return key
 
-    def generate(self, output_file_path: Optional[str], mode: str = "ECB", encrypt: bool = True) -> Tuple[str, str]:
+    def _load_iv(self) -> bytes:
+        if not self.path_iv:
+            raise ValueError("IV file is required for CBC/CTR mode.")
+        with open(self.path_iv, "r", encoding="utf-8") as f:
+            return hex_to_bytes_clean(f.read().strip())
+
+    def _generate_parallel(self, msg_bytes: bytes, output_file_path: Optional[str], mode: str, encrypt: bool,
+                           engine: str, workers: int) -> Tuple[str, str]:
+        key = self._load_key(self.path_key)
+        iv = self._load_iv() if mode.upper() in ("CBC", "CTR") else None
+        if encrypt:
+            cipher = DesCipher.encrypt(msg_bytes, key, iv, mode, engine, workers)
+            if output_file_path:
+                with open(output_file_path, "w", encoding="utf-8") as f:
+                    f.write(cipher.hex())
+            return bytes_to_hex_spaced(cipher), cipher.hex()
+        plain = DesCipher.decrypt(msg_bytes, key, iv, mode, engine, workers)
+        if output_file_path:
+            with open(output_file_path, "w", encoding="utf-8") as f:
+                f.write(plain.decode("utf-8"))
+        return bytes_to_hex_spaced(plain), plain.decode("utf-8")
+
+    def generate_stream(self, output_file_path: str, mode: str = "ECB", encrypt: bool = True,
+                        engine: str = DEFAULT_ENGINE, chunk_size: int = DEFAULT_CHUNK_SIZE, workers: int = 1) -> int:
+        """Binary streaming variant of `generate`: raw bytes in, raw bytes out, constant memory.
+        Returns the number of bytes written to `output_file_path`."""
+        if mode.upper() not in ("ECB", "CBC", "CTR"):
+            raise ValueError("Unsupported mode. Use 'ECB', 'CBC' or 'CTR'.")
+        key = self._load_key(self.path_key)
+        iv = self._load_iv() if mode.upper() in ("CBC", "CTR") else None
+        run = encrypt_file if encrypt else decrypt_file
+        return run(self.path_file, output_file_path, key, mode, iv, chunk_size, engine, workers)
+
+    def read_range(self, offset: int, length: int, engine: str = DEFAULT_ENGINE) -> bytes:
+        """Decrypt `length` bytes at `offset` of a binary CTR ciphertext file (as written by
+        `generate_stream`) without reading or decrypting anything before them."""
+        key = self._load_key(self.path_key)
+        iv = self._load_iv()
+        with open(self.path_file, "rb") as f:
+            f.seek(offset)
+            data = f.read(length)
+        return ctr_crypt_at(data, make_subkeys(key, engine), iv, offset, engine)
+
+    def generate(self, output_file_path: Optional[str], mode: str = "ECB", encrypt: bool = True,
+                 engine: str = DEFAULT_ENGINE, workers: int = 1) -> Tuple[str, str]:
         with open(self.path_file, "r", encoding="utf-8") as f:
             content = f.read()
 
@@ -34,73 +80,109 @@ class DesCipherFile:
                 # fallback nếu file không phải hex (ít dùng)
                 msg_bytes = content.encode("utf-8")
 
-        key_bits = self._load_key_bits(self.path_key)
-        subkeys = generate_subkeys_from_key64(key_bits)
+        if workers > 1:
+            return self._generate_parallel(msg_bytes, output_file_path, mode, encrypt, engine, workers)
+
+        subkeys = make_subkeys(self._load_key(self.path_key), engine)
 
         if mode.upper() == "ECB":
             if encrypt:
-                hex_blocks, cipher = ecb_encrypt(msg_bytes, subkeys)
+                hex_blocks, cipher = ecb_encrypt(msg_bytes, subkeys, engine)
                 if output_file_path:
                     with open(output_file_path, "w", encoding="utf-8") as f:
                         f.write(cipher.hex())
                 return hex_blocks, cipher.hex()
             else:
-                hex_blocks, plain = ecb_decrypt(msg_bytes, subkeys)
+                hex_blocks, plain = ecb_decrypt(msg_bytes, subkeys, engine)
                 if output_file_path:
                     with open(output_file_path, "w", encoding="utf-8") as f:
                         f.write(plain.decode("utf-8"))
                 return hex_blocks, plain.decode("utf-8")
 
         elif mode.upper() == "CBC":
-            if not self.path_iv:
-                raise ValueError("IV file is required for CBC mode.")
-            with open(self.path_iv, "r", encoding="utf-8") as f:
-                iv = hex_to_bytes_clean(f.read().strip())
+            iv = self._load_iv()
+
+            if encrypt:
+                hex_blocks, cipher = cbc_encrypt(msg_bytes, subkeys, iv, engine)
+                if output_file_path:
+                    with open(output_file_path, "w", encoding="utf-8") as f:
+                        f.write(cipher.hex())
+                return hex_blocks, cipher.hex()
+            else:
+                hex_blocks, plain = cbc_decrypt(msg_bytes, subkeys, iv, engine)
+                if output_file_path:
+                    with open(output_file_path, "w", encoding="utf-8") as f:
+                        f.write(plain.decode("utf-8"))
+                return hex_blocks, plain.decode("utf-8")
+
+        elif mode.upper() == "CTR":
+            iv = self._load_iv()
 
             if encrypt:
-                hex_blocks, cipher = cbc_encrypt(msg_bytes, subkeys, iv)
+                hex_blocks, cipher = ctr_encrypt(msg_bytes, subkeys, iv, engine)
                 if output_file_path:
                     with open(output_file_path, "w", encoding="utf-8") as f:
                         f.write(cipher.hex())
                 return hex_blocks, cipher.hex()
             else:
-                hex_blocks, plain = cbc_decrypt(msg_bytes, subkeys, iv)
+                hex_blocks, plain = ctr_decrypt(msg_bytes, subkeys, iv, engine)
                 if output_file_path:
                     with open(output_file_path, "w", encoding="utf-8") as f:
                         f.write(plain.decode("utf-8"))
                 return hex_blocks, plain.decode("utf-8")
         else:
-            raise ValueError("Unsupported mode. Use 'ECB' or 'CBC'.")
+            raise ValueError("Unsupported mode. Use 'ECB', 'CBC' or 'CTR'.")
 
 class DesCipher:
     @staticmethod
-    def encrypt(plaintext: bytes, key: bytes, iv: Optional[bytes] = None, mode: str = "ECB") -> bytes:
-        key_bits = [ (byte >> (7 - i)) & 1 for byte in key for i in range(8) ]
-        subkeys = generate_subkeys_from_key64(key_bits)
+    def encrypt(plaintext: bytes, key: Union[bytes, DesKeySchedule], iv: Optional[bytes] = None, mode: str = "ECB",
+                engine: str = DEFAULT_ENGINE, workers: int = 1) -> bytes:
+        if workers > 1:
+            return get_parallel_cipher(workers, engine).encrypt(plaintext, key, iv, mode)
+        subkeys = make_subkeys(key, engine)
 
         if mode.upper() == "ECB":
-            _, cipher = ecb_encrypt(plaintext, subkeys)
+            _, cipher = ecb_encrypt(plaintext, subkeys, engine)
             return cipher
         elif mode.upper() == "CBC":
             if iv is None:
                 raise ValueError("IV is required for CBC mode.")
-            _, cipher = cbc_encrypt(plaintext, subkeys, iv)
+            _, cipher = cbc_encrypt(plaintext, subkeys, iv, engine)
+            return cipher
+        elif mode.upper() == "CTR":
+            if iv is None:
+                raise ValueError("IV (initial counter block) is required for CTR mode.")
+            _, cipher = ctr_encrypt(plaintext, subkeys, iv, engine)
             return cipher
         else:
-            raise ValueError("Unsupported mode. Use 'ECB' or 'CBC'.")
+            raise ValueError("Unsupported mode. Use 'ECB', 'CBC' or 'CTR'.")
 
     @staticmethod
-    def decrypt(ciphertext: bytes, key: bytes, iv: Optional[bytes] = None, mode: str = "ECB") -> bytes:
-        key_bits = [ (byte >> (7 - i)) & 1 for byte in key for i in range(8) ]
-        subkeys = generate_subkeys_from_key64(key_bits)
+    def decrypt(ciphertext: bytes, key: Union[bytes, DesKeySchedule], iv: Optional[bytes] = None, mode: str = "ECB",
+                engine: str = DEFAULT_ENGINE, workers: int = 1) -> bytes:
+        if workers > 1:
+            return get_parallel_cipher(workers, engine).decrypt(ciphertext, key, iv, mode)
+        subkeys = make_subkeys(key, engine)
 
         if mode.upper() == "ECB":
-            _, plain = ecb_decrypt(ciphertext, subkeys)
+            _, plain = ecb_decrypt(ciphertext, subkeys, engine)
             return plain
         elif mode.upper() == "CBC":
             if iv is None:
                 raise ValueError("IV is required for CBC mode.")
-            _, plain = cbc_decrypt(ciphertext, subkeys, iv)
+            _, plain = cbc_decrypt(ciphertext, subkeys, iv, engine)
+            return plain
+        elif mode.upper() == "CTR":
+            if iv is None:
+                raise ValueError("IV (initial counter block) is required for CTR mode.")
+            _, plain = ctr_decrypt(ciphertext, subkeys, iv, engine)
             return plain
         else:
-            raise ValueError("Unsupported mode. Use 'ECB' or 'CBC'.")
+            raise ValueError("Unsupported mode. Use 'ECB', 'CBC' or 'CTR'.")
+
+    @staticmethod
+    def decrypt_range(data: bytes, key: Union[bytes, DesKeySchedule], iv: bytes, offset: int,
+                      engine: str = DEFAULT_ENGINE) -> bytes:
+        """CTR only: decrypt `data`, the ciphertext bytes found at `offset` of a larger stream,
+        without touching anything before it."""
+        return ctr_crypt_at(data, make_subkeys(key, engine), iv, offset, engine)
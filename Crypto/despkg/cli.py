@@ -4,8 +4,8 @@ from . import DesCipherFile
 
 def main():
     parser = argparse.ArgumentParser(
-        description="DES (ECB/CBC) encryption/decryption using command-line file paths.\n"
-                    "[DES (ECB/CBC) шифрование/расшифровка с использованием путей к файлам в командной строке.]"
+        description="DES (ECB/CBC/CTR) encryption/decryption using command-line file paths.\n"
+                    "[DES (ECB/CBC/CTR) шифрование/расшифровка с использованием путей к файлам в командной строке.]"
     )
     parser.add_argument("--file", "-f", required=True,
                         help="Input file path: plaintext (for encryption) or HEX ciphertext (for decryption).\n"
@@ -14,11 +14,39 @@ def main():
                         help="Key file path (16 hex characters = 8 bytes).\n"
                              "[Путь к файлу ключа (16 шестнадцатеричных символов = 8 байт).]")
     parser.add_argument("--iv", "-i", default=None,
-                        help="IV file path (16 hex characters = 8 bytes). Required for CBC mode.\n"
-                             "[Путь к файлу IV (16 шестнадцатеричных символов = 8 байт). Обязательно для режима CBC.]")
-    parser.add_argument("--mode", "-m", choices=["ECB", "CBC"], default="ECB",
-                        help="DES mode (default: ECB). Options: ECB or CBC.\n\n"
-                             "[Режим DES (по умолчанию: ECB). Варианты: ECB или CBC.]")
+                        help="IV file path (16 hex characters = 8 bytes). Required for CBC and CTR modes.\n"
+                             "[Путь к файлу IV (16 шестнадцатеричных символов = 8 байт). Обязательно для режимов CBC и CTR.]")
+    parser.add_argument("--mode", "-m", choices=["ECB", "CBC", "CTR"], default="ECB",
+                        help="DES mode (default: ECB). Options: ECB, CBC or CTR (the IV is the initial counter block).\n\n"
+                             "[Режим DES (по умолчанию: ECB). Варианты: ECB, CBC или CTR (IV — начальный блок счётчика).]")
+    parser.add_argument("--engine", choices=["int", "bitslice", "bits"], default="int",
+                        help="DES block engine (default: int). 'int' is the fast table-driven core "
+                             "(switches to bitslice for large ECB/CBC-decrypt/CTR inputs), 'bitslice' always "
+                             "processes independent blocks in lockstep, 'bits' is the reference bit-list "
+                             "implementation.\n"
+                             "[Движок DES (по умолчанию: int). 'int' — быстрое табличное ядро (для больших "
+                             "входов ECB/CBC-расшифровки/CTR переключается на bitslice), 'bitslice' — всегда "
+                             "обрабатывает независимые блоки параллельно по битам, 'bits' — эталонная "
+                             "реализация на списках битов.]")
+    parser.add_argument("--stream", "--binary", "-s", action="store_true",
+                        help="Stream the file in binary chunks with constant memory: raw bytes in, raw bytes out "
+                             "(no HEX). Requires --output.\n"
+                             "[Потоковая обработка файла блоками с постоянным расходом памяти: двоичные данные "
+                             "на входе и выходе (без HEX). Требует --output.]")
+    parser.add_argument("--chunk", type=int, default=1 << 20,
+                        help="Chunk size in bytes for --stream (default: 1048576).\n"
+                             "[Размер блока чтения в байтах для --stream (по умолчанию: 1048576).]")
+    parser.add_argument("--workers", "-w", type=int, default=1,
+                        help="Number of worker processes for ECB, CBC decryption and CTR (default: 1).\n"
+                             "[Количество рабочих процессов для ECB, расшифровки CBC и CTR (по умолчанию: 1).]")
+    parser.add_argument("--offset", type=int, default=None,
+                        help="CTR decryption only: decrypt just the byte range starting here of a binary "
+                             "ciphertext file (use with --length).\n"
+                             "[Только для расшифровки CTR: расшифровать лишь диапазон байтов двоичного "
+                             "шифртекста, начиная с этой позиции (вместе с --length).]")
+    parser.add_argument("--length", type=int, default=None,
+                        help="Number of bytes to decrypt with --offset.\n"
+                             "[Количество байтов для расшифровки с --offset.]")
     parser.add_argument("--encrypt", "-e", action="store_true",
                         help="Enable to ENCRYPT. If omitted, the program will DECRYPT.\n"
                              "[Включите для ШИФРОВАНИЯ. Если не указано, программа будет РАСШИФРОВЫВАТЬ.]")
@@ -31,10 +59,41 @@ def main():
 
     try:
         des = DesCipherFile(args.file, args.key, args.iv)
+        if args.offset is not None or args.length is not None:
+            if args.mode != "CTR" or args.encrypt:
+                raise ValueError("--offset/--length are only supported for CTR decryption.")
+            if args.offset is None or args.length is None:
+                raise ValueError("--offset and --length must be given together.")
+            plain = des.read_range(args.offset, args.length, engine=args.engine)
+            if args.output:
+                with open(args.output, "wb") as f:
+                    f.write(plain)
+                print(f"[*] Plaintext range ({len(plain)} bytes) saved to: {args.output}")
+            else:
+                sys.stdout.buffer.write(plain)
+            return
+
+        if args.stream:
+            if not args.output:
+                raise ValueError("--stream requires --output.")
+            written = des.generate_stream(
+                output_file_path=args.output,
+                mode=args.mode,
+                encrypt=args.encrypt,
+                engine=args.engine,
+                chunk_size=args.chunk,
+                workers=args.workers
+            )
+            print("[*] Mode:", args.mode)
+            print(f"[*] {'Ciphertext' if args.encrypt else 'Plaintext'} ({written} bytes) saved to: {args.output}")
+            return
+
         hex_blocks, result = des.generate(
             output_file_path=args.output,
             mode=args.mode,
-            encrypt=args.encrypt
+            encrypt=args.encrypt,
+            engine=args.engine,
+            workers=args.workers
         )
 
         if args.encrypt:
@@ -1,46 +1,171 @@
-from typing import List, Tuple
-from .bits import pkcs7_pad, pkcs7_unpad, bytes_to_hex_spaced
-from .block import des_block_encrypt, des_block_decrypt
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+from Crypto.fastbytes import xorBytes
+from .bits import pkcs7_pad, pkcs7_unpad, bytes_to_hex_spaced, bytes_to_bits
+from .block import des_block_encrypt, des_block_decrypt, generate_subkeys_from_key64
+from .block_int import (des_block_encrypt_int, des_block_decrypt_int,
+                        des_blocks_encrypt_int, des_blocks_decrypt_int)
+from .bitslice import des_blocks_encrypt_bitslice, des_blocks_decrypt_bitslice
+from .schedule import DesKeySchedule, get_key_schedule
 
-def ecb_encrypt(plain: bytes, subkeys: List[List[int]]) -> Tuple[str, bytes]:
-    data = pkcs7_pad(plain, 8)
+BlockFn = Callable[[bytes, Sequence], bytes]
+Subkeys = Union[List, DesKeySchedule]
+
+@dataclass(frozen=True)
+class DesEngine:
+    """Block functions of one DES implementation: single block and many independent blocks."""
+    encrypt_block: BlockFn
+    decrypt_block: BlockFn
+    encrypt_blocks: BlockFn
+    decrypt_blocks: BlockFn
+
+def _blockwise(fn: BlockFn) -> BlockFn:
+    def run(data: bytes, subkeys: Sequence) -> bytes:
+        return b"".join(fn(data[i:i+8], subkeys) for i in range(0, len(data), 8))
+    return run
+
+# "bits" is the readable bit-list reference, "int" the table-driven integer core,
+# "bitslice" runs independent blocks in lockstep (single blocks fall back to "int")
+ENGINES: Dict[str, DesEngine] = {
+    "bits": DesEngine(des_block_encrypt, des_block_decrypt,
+                      _blockwise(des_block_encrypt), _blockwise(des_block_decrypt)),
+    "int": DesEngine(des_block_encrypt_int, des_block_decrypt_int,
+                     des_blocks_encrypt_int, des_blocks_decrypt_int),
+    "bitslice": DesEngine(des_block_encrypt_int, des_block_decrypt_int,
+                          des_blocks_encrypt_bitslice, des_blocks_decrypt_bitslice),
+}
+
+# Inputs at least this long go through the bitsliced kernel when the "int" engine
+# (or a DesKeySchedule) is used; below it the fixed per-batch cost does not pay off.
+BITSLICE_THRESHOLD = 4096
+
+DEFAULT_ENGINE = "int"
+
+def get_engine(name: str) -> DesEngine:
+    try:
+        return ENGINES[name]
+    except KeyError:
+        raise ValueError(f"Unknown DES engine: {name!r}. Use one of {sorted(ENGINES)}.") from None
+
+def make_subkeys(key: Union[bytes, DesKeySchedule], engine: str = DEFAULT_ENGINE) -> Subkeys:
+    """Build the round keys in the representation expected by the given engine.
+    The int engine uses the process-wide schedule cache, so a repeated key costs a dict lookup."""
+    if isinstance(key, DesKeySchedule):
+        return key
+    if engine in ("int", "bitslice"):
+        return get_key_schedule(key)
+    return generate_subkeys_from_key64(bytes_to_bits(key))
+
+def _check_schedule_engine(engine: Optional[str]) -> None:
+    if engine not in (None, "int", "bitslice"):
+        raise ValueError("DesKeySchedule holds integer subkeys; use the 'int' or 'bitslice' engine.")
+
+def _crypt_blocks(data: bytes, subkeys: Subkeys, engine: Optional[str], decrypt: bool) -> bytes:
+    """Run independent blocks through the engine; a DesKeySchedule skips subkey reversal."""
+    if isinstance(subkeys, DesKeySchedule):
+        _check_schedule_engine(engine)
+        keys = subkeys.decrypt_subkeys if decrypt else subkeys.encrypt_subkeys
+        if engine == "bitslice" or len(data) >= BITSLICE_THRESHOLD:
+            return des_blocks_encrypt_bitslice(data, keys)
+        return des_blocks_encrypt_int(data, keys)
+    if engine == "int" and len(data) >= BITSLICE_THRESHOLD:
+        engine = "bitslice"
+    eng = get_engine(engine or "bits")
+    return (eng.decrypt_blocks if decrypt else eng.encrypt_blocks)(data, subkeys)
+
+def _block_encryptor(subkeys: Subkeys, engine: Optional[str]) -> Callable[[bytes], bytes]:
+    if isinstance(subkeys, DesKeySchedule):
+        _check_schedule_engine(engine)
+        keys = subkeys.encrypt_subkeys
+        return lambda block: des_block_encrypt_int(block, keys)
+    encrypt_block = get_engine(engine or "bits").encrypt_block
+    return lambda block: encrypt_block(block, subkeys)
+
+# ---- raw block-aligned primitives (no padding); CBC ones take and return the chaining block ----
+def ecb_encrypt_blocks(data: bytes, subkeys: Subkeys, engine: Optional[str] = None) -> bytes:
+    return _crypt_blocks(data, subkeys, engine, decrypt=False)
+
+def ecb_decrypt_blocks(data: bytes, subkeys: Subkeys, engine: Optional[str] = None) -> bytes:
+    return _crypt_blocks(data, subkeys, engine, decrypt=True)
+
+def cbc_encrypt_blocks(data: bytes, subkeys: Subkeys, iv: bytes, engine: Optional[str] = None) -> Tuple[bytes, bytes]:
+    """CBC-encrypt block-aligned data; returns (ciphertext, last ciphertext block)."""
+    encrypt_block = _block_encryptor(subkeys, engine)
     out = bytearray()
+    prev = iv
     for i in range(0, len(data), 8):
-        out += des_block_encrypt(data[i:i+8], subkeys)
-    return bytes_to_hex_spaced(bytes(out)), bytes(out)
+        prev = encrypt_block(xorBytes(data[i:i+8], prev))
+        out += prev
+    return bytes(out), prev
+
+def cbc_decrypt_blocks(data: bytes, subkeys: Subkeys, iv: bytes, engine: Optional[str] = None) -> Tuple[bytes, bytes]:
+    """CBC-decrypt block-aligned data; returns (plaintext, last ciphertext block)."""
+    if not data:
+        return b"", iv
+    # P_i = D(C_i) ^ C_{i-1}: decrypt all blocks at once, then one wide XOR with IV || C[:-8]
+    decrypted = _crypt_blocks(data, subkeys, engine, decrypt=True)
+    return xorBytes(decrypted, iv + data[:-8]), data[-8:]
+
+# ---- CTR: counter block i = (IV + i) mod 2^64, keystream = E(counter blocks) ----
+# Keystream is produced this many blocks at a time, so large inputs take the bitsliced path.
+CTR_BATCH_BLOCKS = 16384
 
-def ecb_decrypt(cipher: bytes, subkeys: List[List[int]]) -> Tuple[str, bytes]:
+def ctr_keystream(subkeys: Subkeys, iv: bytes, start_block: int, n_blocks: int,
+                  engine: Optional[str] = None) -> bytes:
+    """Keystream blocks [start_block, start_block + n_blocks) for the given initial counter block."""
+    if len(iv) != 8:
+        raise ValueError("IV must be 8 bytes")
+    first = int.from_bytes(iv, "big") + start_block
+    counters = b"".join(((first + i) & 0xFFFFFFFFFFFFFFFF).to_bytes(8, "big") for i in range(n_blocks))
+    return _crypt_blocks(counters, subkeys, engine, decrypt=False)
+
+def ctr_crypt_at(data: bytes, subkeys: Subkeys, iv: bytes, offset: int = 0, engine: Optional[str] = None) -> bytes:
+    """XOR `data` with the CTR keystream starting at byte `offset` of the stream.
+
+    Encryption and decryption are the same operation. Any byte range can be
+    processed on its own: only the keystream blocks covering it are computed.
+    """
+    if offset < 0:
+        raise ValueError("offset must be non-negative")
+    out = bytearray()
+    pos = 0
+    while pos < len(data):
+        block, skip = divmod(offset + pos, 8)
+        n = min(len(data) - pos, CTR_BATCH_BLOCKS * 8 - skip)
+        stream = ctr_keystream(subkeys, iv, block, -(-(skip + n) // 8), engine)
+        out += xorBytes(data[pos:pos + n], stream[skip:skip + n])
+        pos += n
+    return bytes(out)
+
+def ecb_encrypt(plain: bytes, subkeys: Subkeys, engine: Optional[str] = None) -> Tuple[str, bytes]:
+    out = ecb_encrypt_blocks(pkcs7_pad(plain, 8), subkeys, engine)
+    return bytes_to_hex_spaced(out), out
+
+def ecb_decrypt(cipher: bytes, subkeys: Subkeys, engine: Optional[str] = None) -> Tuple[str, bytes]:
     if len(cipher) % 8 != 0:
         raise ValueError("Ciphertext length must be multiple of 8")
-    out = bytearray()
-    for i in range(0, len(cipher), 8):
-        out += des_block_decrypt(cipher[i:i+8], subkeys)
-    plain = pkcs7_unpad(bytes(out), 8)
+    plain = pkcs7_unpad(ecb_decrypt_blocks(cipher, subkeys, engine), 8)
     return bytes_to_hex_spaced(plain), plain
 
-def cbc_encrypt(plain: bytes, subkeys: List[List[int]], iv: bytes) -> Tuple[str, bytes]:
+def cbc_encrypt(plain: bytes, subkeys: Subkeys, iv: bytes, engine: Optional[str] = None) -> Tuple[str, bytes]:
     if len(iv) != 8:
         raise ValueError("IV must be 8 bytes")
-    data = pkcs7_pad(plain, 8)
-    out = bytearray()
-    prev = iv
-    for i in range(0, len(data), 8):
-        block = bytes(a ^ b for a, b in zip(data[i:i+8], prev))
-        enc = des_block_encrypt(block, subkeys)
-        out += enc
-        prev = enc
-    return bytes_to_hex_spaced(bytes(out)), bytes(out)
+    out, _ = cbc_encrypt_blocks(pkcs7_pad(plain, 8), subkeys, iv, engine)
+    return bytes_to_hex_spaced(out), out
 
-def cbc_decrypt(cipher: bytes, subkeys: List[List[int]], iv: bytes) -> Tuple[str, bytes]:
+def cbc_decrypt(cipher: bytes, subkeys: Subkeys, iv: bytes, engine: Optional[str] = None) -> Tuple[str, bytes]:
     if len(iv) != 8:
         raise ValueError("IV must be 8 bytes")
     if len(cipher) % 8 != 0:
         raise ValueError("Ciphertext length must be multiple of 8")
-    out = bytearray()
-    prev = iv
-    for i in range(0, len(cipher), 8):
-        dec = des_block_decrypt(cipher[i:i+8], subkeys)
-        out += bytes(a ^ b for a, b in zip(dec, prev))
-        prev = cipher[i:i+8]
-    plain = pkcs7_unpad(bytes(out), 8)
+    out, _ = cbc_decrypt_blocks(cipher, subkeys, iv, engine)
+    plain = pkcs7_unpad(out, 8)
     return bytes_to_hex_spaced(plain), plain
+
+def ctr_encrypt(plain: bytes, subkeys: Subkeys, iv: bytes, engine: Optional[str] = None) -> Tuple[str, bytes]:
+    out = ctr_crypt_at(plain, subkeys, iv, 0, engine)
+    return bytes_to_hex_spaced(out), out
+
+def ctr_decrypt(cipher: bytes, subkeys: Subkeys, iv: bytes, engine: Optional[str] = None) -> Tuple[str, bytes]:
+    out = ctr_crypt_at(cipher, subkeys, iv, 0, engine)
+    return bytes_to_hex_spaced(out), out
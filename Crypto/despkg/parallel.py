@@ -0,0 +1,174 @@
+"""Multi-process DES for the parallelizable workloads: ECB (both directions), CBC
+decryption and CTR.
+
+The input is copied once into a `multiprocessing.shared_memory` block; each
+worker attaches to it by name, processes one block-aligned slice and writes
+its result at the same offset of a shared output block, so only tiny task
+descriptors are pickled and the output is already in order. CBC encryption
+is inherently serial and is delegated to the single-process path.
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Tuple, Union
+from .bits import pkcs7_pad, pkcs7_unpad
+from .schedule import DesKeySchedule
+from .modes import (ecb_encrypt_blocks, ecb_decrypt_blocks, cbc_encrypt_blocks, cbc_decrypt_blocks,
+                    ctr_crypt_at, make_subkeys, DEFAULT_ENGINE)
+
+# Below this size the pool round-trip costs more than it saves.
+PARALLEL_MIN_BYTES = 256 * 1024
+DEFAULT_PARALLEL_CHUNK = 1 << 20
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+def _process(op: str, data: bytes, key: bytes, iv: Optional[bytes], offset: int, engine: str) -> bytes:
+    subkeys = make_subkeys(key, engine)
+    if op == "ecb_encrypt":
+        return ecb_encrypt_blocks(data, subkeys, engine)
+    if op == "ecb_decrypt":
+        return ecb_decrypt_blocks(data, subkeys, engine)
+    if op == "cbc_decrypt":
+        return cbc_decrypt_blocks(data, subkeys, iv, engine)[0]
+    if op == "ctr":
+        return ctr_crypt_at(data, subkeys, iv, offset, engine)
+    raise ValueError(f"Unknown operation: {op!r}")
+
+def _worker(in_name: str, out_name: str, start: int, end: int, op: str, key: bytes,
+            iv: Optional[bytes], offset: int, engine: str) -> None:
+    shm_in = _attach(in_name)
+    shm_out = _attach(out_name)
+    try:
+        out = _process(op, bytes(shm_in.buf[start:end]), key, iv, offset, engine)
+        shm_out.buf[start:end] = out
+    finally:
+        shm_in.close()
+        shm_out.close()
+
+class ParallelDesCipher:
+    """DES over a process pool; same results as DesCipher, spread across `workers` cores."""
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = DEFAULT_PARALLEL_CHUNK,
+                 engine: str = DEFAULT_ENGINE) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = max(8, chunk_size - chunk_size % 8)
+        self.engine = engine
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def close(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def __enter__(self) -> "ParallelDesCipher":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _run(self, op: str, data: bytes, key: Union[bytes, DesKeySchedule],
+             iv: Optional[bytes] = None, offset: int = 0) -> bytes:
+        if isinstance(key, DesKeySchedule):
+            key = key.key
+        n = len(data)
+        if self.workers <= 1 or n < PARALLEL_MIN_BYTES:
+            return _process(op, bytes(data), key, iv, offset, self.engine)
+        # at least one chunk per worker, each a multiple of the block size
+        chunk = min(self.chunk_size, -(-n // self.workers))
+        chunk += -chunk % 8
+        shm_in = shared_memory.SharedMemory(create=True, size=n)
+        shm_out = shared_memory.SharedMemory(create=True, size=n)
+        try:
+            shm_in.buf[:n] = data
+            pool = self._pool()
+            futures = []
+            for start in range(0, n, chunk):
+                end = min(start + chunk, n)
+                # CBC: the chaining block of a chunk is the ciphertext block just before it
+                chunk_iv = iv if op != "cbc_decrypt" or start == 0 else bytes(data[start - 8:start])
+                futures.append(pool.submit(_worker, shm_in.name, shm_out.name, start, end, op, key,
+                                           chunk_iv, offset + start, self.engine))
+            for future in futures:
+                future.result()
+            return bytes(shm_out.buf[:n])
+        finally:
+            shm_in.close()
+            shm_in.unlink()
+            shm_out.close()
+            shm_out.unlink()
+
+    # ---- raw block-aligned primitives, mirroring modes.*_blocks ----
+    def ecb_encrypt_blocks(self, data: bytes, key: Union[bytes, DesKeySchedule]) -> bytes:
+        return self._run("ecb_encrypt", data, key)
+
+    def ecb_decrypt_blocks(self, data: bytes, key: Union[bytes, DesKeySchedule]) -> bytes:
+        return self._run("ecb_decrypt", data, key)
+
+    def cbc_decrypt_blocks(self, data: bytes, key: Union[bytes, DesKeySchedule], iv: bytes) -> Tuple[bytes, bytes]:
+        """Returns (plaintext, last ciphertext block), like modes.cbc_decrypt_blocks."""
+        if not data:
+            return b"", iv
+        return self._run("cbc_decrypt", data, key, iv), data[-8:]
+
+    def ctr_crypt_at(self, data: bytes, key: Union[bytes, DesKeySchedule], iv: bytes, offset: int = 0) -> bytes:
+        return self._run("ctr", data, key, iv, offset)
+
+    # ---- padded message API, same contract as DesCipher ----
+    def encrypt(self, plaintext: bytes, key: Union[bytes, DesKeySchedule], iv: Optional[bytes] = None,
+                mode: str = "ECB") -> bytes:
+        mode = mode.upper()
+        if mode == "ECB":
+            return self.ecb_encrypt_blocks(pkcs7_pad(plaintext, 8), key)
+        if mode in ("CBC", "CTR"):
+            if iv is None:
+                raise ValueError(f"IV is required for {mode} mode.")
+            if len(iv) != 8:
+                raise ValueError("IV must be 8 bytes")
+            if mode == "CTR":
+                return self.ctr_crypt_at(plaintext, key, iv)
+            # CBC encryption is a serial chain, nothing to fan out
+            return cbc_encrypt_blocks(pkcs7_pad(plaintext, 8), make_subkeys(key, self.engine), iv, self.engine)[0]
+        raise ValueError("Unsupported mode. Use 'ECB', 'CBC' or 'CTR'.")
+
+    def decrypt(self, ciphertext: bytes, key: Union[bytes, DesKeySchedule], iv: Optional[bytes] = None,
+                mode: str = "ECB") -> bytes:
+        mode = mode.upper()
+        if mode == "CTR":
+            if iv is None:
+                raise ValueError("IV (initial counter block) is required for CTR mode.")
+            return self.ctr_crypt_at(ciphertext, key, iv)
+        if len(ciphertext) % 8 != 0:
+            raise ValueError("Ciphertext length must be multiple of 8")
+        if mode == "ECB":
+            return pkcs7_unpad(self.ecb_decrypt_blocks(ciphertext, key), 8)
+        if mode == "CBC":
+            if iv is None:
+                raise ValueError("IV is required for CBC mode.")
+            if len(iv) != 8:
+                raise ValueError("IV must be 8 bytes")
+            return pkcs7_unpad(self.cbc_decrypt_blocks(ciphertext, key, iv)[0], 8)
+        raise ValueError("Unsupported mode. Use 'ECB', 'CBC' or 'CTR'.")
+
+_shared: Dict[Tuple[int, str], ParallelDesCipher] = {}
+_shared_lock = threading.Lock()
+
+def get_parallel_cipher(workers: int, engine: str = DEFAULT_ENGINE) -> ParallelDesCipher:
+    """Process-wide ParallelDesCipher per (workers, engine), so the pool is started only once."""
+    with _shared_lock:
+        cipher = _shared.get((workers, engine))
+        if cipher is None:
+            cipher = _shared[(workers, engine)] = ParallelDesCipher(workers, engine=engine)
+        return cipher
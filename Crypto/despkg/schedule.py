@@ -0,0 +1,82 @@
+"""Precomputed DES key schedules and a bounded LRU cache of them keyed by key bytes."""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Tuple
+from .block_int import generate_subkeys_int
+
+class DesKeySchedule:
+    """The 16 round keys of one DES key, as 48-bit ints, in both round orders.
+
+    Build it once per session key and pass it to the mode functions instead of a
+    subkey list; PC1/PC2 and the shift schedule are then never recomputed.
+    """
+    __slots__ = ("key", "encrypt_subkeys", "decrypt_subkeys")
+
+    def __init__(self, key: bytes) -> None:
+        key = bytes(key)
+        subkeys = tuple(generate_subkeys_int(key))
+        self.key = key
+        self.encrypt_subkeys: Tuple[int, ...] = subkeys
+        self.decrypt_subkeys: Tuple[int, ...] = subkeys[::-1]
+
+    def __repr__(self) -> str:
+        return "DesKeySchedule(<16 subkeys>)"
+
+@dataclass(frozen=True)
+class ScheduleCacheInfo:
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+class KeyScheduleCache:
+    """Thread-safe LRU cache mapping key bytes -> DesKeySchedule."""
+
+    def __init__(self, maxsize: int = 256) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be >= 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[bytes, DesKeySchedule]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: bytes) -> DesKeySchedule:
+        key = bytes(key)
+        with self._lock:
+            schedule = self._entries.get(key)
+            if schedule is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return schedule
+            self.misses += 1
+        schedule = DesKeySchedule(key)
+        with self._lock:
+            self._entries[key] = schedule
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return schedule
+
+    def info(self) -> ScheduleCacheInfo:
+        with self._lock:
+            return ScheduleCacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+_default_cache = KeyScheduleCache()
+
+def get_key_schedule(key: bytes) -> DesKeySchedule:
+    """Return the (cached) schedule for an 8-byte DES key."""
+    return _default_cache.get(key)
+
+def schedule_cache_info() -> ScheduleCacheInfo:
+    return _default_cache.info()
+
+def clear_schedule_cache() -> None:
+    _default_cache.clear()
@@ -0,0 +1,146 @@
+"""Incremental (streaming) DES encryption/decryption with constant memory.
+
+Data is fed in arbitrary pieces; only whole blocks are processed, the CBC
+chaining block and a sub-block remainder are carried between calls, and
+PKCS#7 padding is applied/removed only at `finalize()`. CTR needs neither
+padding nor holdback, only the current byte position. Output is raw binary.
+"""
+from typing import BinaryIO, Optional, Union
+from .bits import pkcs7_pad, pkcs7_unpad
+from .schedule import DesKeySchedule
+from .modes import (ecb_encrypt_blocks, ecb_decrypt_blocks, cbc_encrypt_blocks, cbc_decrypt_blocks,
+                    ctr_crypt_at, make_subkeys, DEFAULT_ENGINE)
+from .parallel import get_parallel_cipher
+
+DEFAULT_CHUNK_SIZE = 1 << 20  # 1 MiB, a multiple of the block size
+
+class _DesStream:
+    def __init__(self, key: Union[bytes, DesKeySchedule], mode: str = "ECB", iv: Optional[bytes] = None,
+                 engine: str = DEFAULT_ENGINE, workers: int = 1) -> None:
+        self.mode = mode.upper()
+        if self.mode not in ("ECB", "CBC", "CTR"):
+            raise ValueError("Unsupported mode. Use 'ECB', 'CBC' or 'CTR'.")
+        if self.mode in ("CBC", "CTR"):
+            if iv is None:
+                raise ValueError(f"IV is required for {self.mode} mode.")
+            if len(iv) != 8:
+                raise ValueError("IV must be 8 bytes")
+        self.engine = engine
+        self._subkeys = make_subkeys(key, engine)
+        self._key = key  # the pool workers build their own subkeys from the key itself
+        # ECB, CBC decryption and CTR chunks can be fanned out to a process pool
+        self._parallel = get_parallel_cipher(workers, engine) if workers > 1 else None
+        self._prev = iv
+        self._pending = b""
+        self._position = 0  # CTR: bytes processed so far
+        self._finalized = False
+
+    def _check_open(self) -> None:
+        if self._finalized:
+            raise ValueError("Stream already finalized")
+
+    def _ctr(self, data: bytes) -> bytes:
+        if self._parallel is not None:
+            out = self._parallel.ctr_crypt_at(data, self._key, self._prev, self._position)
+        else:
+            out = ctr_crypt_at(data, self._subkeys, self._prev, self._position, self.engine)
+        self._position += len(data)
+        return out
+
+class DesStreamEncryptor(_DesStream):
+    """Encrypt a stream piecewise: out = update(a) + update(b) + ... + finalize()."""
+
+    def update(self, data: bytes) -> bytes:
+        self._check_open()
+        if self.mode == "CTR":
+            return self._ctr(data)
+        if self._pending:
+            data = self._pending + data
+        n = len(data) - len(data) % 8
+        self._pending = data[n:]
+        return self._crypt(data[:n])
+
+    def finalize(self) -> bytes:
+        self._check_open()
+        self._finalized = True
+        if self.mode == "CTR":
+            return b""
+        return self._crypt(pkcs7_pad(self._pending, 8))
+
+    def _crypt(self, blocks: bytes) -> bytes:
+        if not blocks:
+            return b""
+        if self.mode == "ECB":
+            if self._parallel is not None:
+                return self._parallel.ecb_encrypt_blocks(blocks, self._key)
+            return ecb_encrypt_blocks(blocks, self._subkeys, self.engine)
+        out, self._prev = cbc_encrypt_blocks(blocks, self._subkeys, self._prev, self.engine)
+        return out
+
+class DesStreamDecryptor(_DesStream):
+    """Decrypt a stream piecewise. The last block is held back until `finalize()`,
+    because it carries the PKCS#7 padding."""
+
+    def update(self, data: bytes) -> bytes:
+        self._check_open()
+        if self.mode == "CTR":
+            return self._ctr(data)
+        if self._pending:
+            data = self._pending + data
+        keep = len(data) % 8 or min(8, len(data))
+        n = len(data) - keep
+        self._pending = data[n:]
+        return self._crypt(data[:n])
+
+    def finalize(self) -> bytes:
+        self._check_open()
+        self._finalized = True
+        if self.mode == "CTR":
+            return b""
+        if len(self._pending) != 8:
+            raise ValueError("Ciphertext length must be multiple of 8")
+        return pkcs7_unpad(self._crypt(self._pending), 8)
+
+    def _crypt(self, blocks: bytes) -> bytes:
+        if not blocks:
+            return b""
+        if self.mode == "ECB":
+            if self._parallel is not None:
+                return self._parallel.ecb_decrypt_blocks(blocks, self._key)
+            return ecb_decrypt_blocks(blocks, self._subkeys, self.engine)
+        if self._parallel is not None:
+            out, self._prev = self._parallel.cbc_decrypt_blocks(blocks, self._key, self._prev)
+            return out
+        out, self._prev = cbc_decrypt_blocks(blocks, self._subkeys, self._prev, self.engine)
+        return out
+
+def _pump(stream: _DesStream, src: BinaryIO, dst: BinaryIO, chunk_size: int) -> int:
+    chunk_size = max(8, chunk_size - chunk_size % 8)
+    written = 0
+    while True:
+        chunk = src.read(chunk_size)
+        if not chunk:
+            break
+        out = stream.update(chunk)
+        dst.write(out)
+        written += len(out)
+    out = stream.finalize()
+    dst.write(out)
+    return written + len(out)
+
+def encrypt_file(src_path: str, dst_path: str, key: Union[bytes, DesKeySchedule], mode: str = "ECB",
+                 iv: Optional[bytes] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 engine: str = DEFAULT_ENGINE, workers: int = 1) -> int:
+    """Encrypt a file of any size into raw binary ciphertext. Returns bytes written.
+    With `workers` > 1, `chunk_size` bytes per worker are read and processed per step."""
+    stream = DesStreamEncryptor(key, mode, iv, engine, workers)
+    with open(src_path, "rb") as src, open(dst_path, "wb") as dst:
+        return _pump(stream, src, dst, chunk_size * max(1, workers))
+
+def decrypt_file(src_path: str, dst_path: str, key: Union[bytes, DesKeySchedule], mode: str = "ECB",
+                 iv: Optional[bytes] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 engine: str = DEFAULT_ENGINE, workers: int = 1) -> int:
+    """Decrypt raw binary ciphertext produced by `encrypt_file`. Returns bytes written."""
+    stream = DesStreamDecryptor(key, mode, iv, engine, workers)
+    with open(src_path, "rb") as src, open(dst_path, "wb") as dst:
+        return _pump(stream, src, dst, chunk_size * max(1, workers))
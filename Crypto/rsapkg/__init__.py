@@ -1,11 +1,20 @@
 """Educational RSA package.
 Exports:
 - RsaKeyPair, generateKeyPair: key generation utilities
-- rsaEncrypt, rsaDecrypt, rsaSign, rsaVerify: core RSA ops
+- rsaEncrypt, rsaDecrypt, rsaSign, rsaVerify, rsaVerifyMany: core RSA ops
 - OAEP/PKCS#1 v1.5/PSS helpers
 - intToHex, hexToInt, i2osp, os2ip: utility conversions
 - save/load PEM (custom JSON+Base64) for public/private keys
+- save/load binary key containers (length-prefixed integers, see keybin.py)
+- parsedKeyCacheInfo, clearParsedKeyCache: cache behind Rsa.from_*_pem / from_key_bytes
+- CrtKey: CRT private-key parameters (p, q, dP, dQ, qInv)
+- KeyPool: background pool of pre-generated key pairs
+- RsaKeyContext, getKeyContext, keyContextCacheInfo: cached per-key precomputation
 """
-from .rsa import Rsa
-from .pem import savePrivateKeyPem, savePublicKeyPem, loadPrivateKeyPem, loadPublicKeyPem
-from .keys import RsaKeyPair, generateKeyPair
\ No newline at end of file
+from .rsa import Rsa, parsedKeyCacheInfo, clearParsedKeyCache
+from .pem import savePrivateKeyPem, savePublicKeyPem, loadPrivateKeyPem, loadPrivateKeyPemCrt, loadPublicKeyPem
+from .keybin import saveKeyBinary, loadKeyBinary, loadPublicKeyBinary, isKeyBinary
+from .crt import CrtKey
+from .keys import RsaKeyPair, generateKeyPair
+from .keypool import KeyPool, KeyPoolStats
+from .context import RsaKeyContext, getKeyContext, keyContextCacheInfo, clearKeyContextCache
@@ -1,5 +1,6 @@
 import argparse, sys, base64
 from . import Rsa
+from .keybin import isKeyBinary
 
 def read_file(path: str, binary: bool = True) -> bytes:
     mode = "rb" if binary else "r"
@@ -11,23 +12,35 @@ def write_file(path: str, data: bytes, binary: bool = True):
     with open(path, mode) as f:
         f.write(data if binary else data.decode("utf-8"))
 
+def load_key(path: str, private: bool) -> Rsa:
+    """Key file in either format: binary container or our PEM."""
+    data = read_file(path, binary=True)
+    if isKeyBinary(data):
+        return Rsa.from_key_bytes(data, private=private)
+    pem = data.decode("utf-8")
+    return Rsa.from_private_pem(pem) if private else Rsa.from_public_pem(pem)
+
 def cmd_genkey(args):
-    ctx = Rsa.generate(bits=args.bits, e=args.e)
-    priv_pem = ctx.to_private_pem()
-    pub_pem = ctx.to_public_pem()
+    ctx = Rsa.generate(bits=args.bits, e=args.e, workers=args.workers)
+    if args.format == "bin":
+        if not (args.private and args.public):
+            sys.exit("--format bin needs both --private and --public output files")
+        priv, pub = ctx.to_key_bytes(), ctx.to_key_bytes(private=False)
+    else:
+        priv, pub = ctx.to_private_pem().encode("utf-8"), ctx.to_public_pem().encode("utf-8")
     if args.private:
-        write_file(args.private, priv_pem.encode("utf-8"), binary=True)
+        write_file(args.private, priv, binary=True)
         print(f"Private key saved to: {args.private}")
     else:
-        print(priv_pem)
+        print(priv.decode("utf-8"))
     if args.public:
-        write_file(args.public, pub_pem.encode("utf-8"), binary=True)
+        write_file(args.public, pub, binary=True)
         print(f"Public key saved to: {args.public}")
     else:
-        print(pub_pem)
+        print(pub.decode("utf-8"))
 
 def cmd_encrypt(args):
-    ctx = Rsa.from_public_pem(read_file(args.pub, binary=False).decode("utf-8"))
+    ctx = load_key(args.pub, private=False)
     data = read_file(args.input, binary=True)
     ct = ctx.encrypt(data, padding=args.padding)
     out = base64.b64encode(ct) if args.base64 else ct
@@ -41,7 +54,7 @@ def cmd_encrypt(args):
             sys.stdout.buffer.write(out)
 
 def cmd_decrypt(args):
-    ctx = Rsa.from_private_pem(read_file(args.priv, binary=False).decode("utf-8"))
+    ctx = load_key(args.priv, private=True)
     data = read_file(args.input, binary=True)
     if args.base64:
         data = base64.b64decode(data)
@@ -53,7 +66,7 @@ def cmd_decrypt(args):
         sys.stdout.buffer.write(pt)
 
 def cmd_sign(args):
-    ctx = Rsa.from_private_pem(read_file(args.priv, binary=False).decode("utf-8"))
+    ctx = load_key(args.priv, private=True)
     msg = read_file(args.input, binary=True)
     sig = ctx.sign(msg, padding=args.padding)
     out = base64.b64encode(sig) if args.base64 else sig
@@ -67,7 +80,7 @@ def cmd_sign(args):
             sys.stdout.buffer.write(out)
 
 def cmd_verify(args):
-    ctx = Rsa.from_public_pem(read_file(args.pub, binary=False).decode("utf-8"))
+    ctx = load_key(args.pub, private=False)
     msg = read_file(args.input, binary=True)
     sig = read_file(args.signature, binary=True)
     if args.base64:
@@ -86,12 +99,16 @@ def main():
     p_gen = sub.add_parser("genkey", help="Generate RSA key pair")
     p_gen.add_argument("--bits", type=int, default=2048, help="Key size in bits (default: 2048)")
     p_gen.add_argument("-e", type=int, default=65537, help="Public exponent (default: 65537)")
-    p_gen.add_argument("--private", help="Output file for private key PEM")
-    p_gen.add_argument("--public", help="Output file for public key PEM")
+    p_gen.add_argument("-w", "--workers", type=int, default=1,
+                       help="Processes searching for the primes in parallel (default: 1)")
+    p_gen.add_argument("--private", help="Output file for private key")
+    p_gen.add_argument("--public", help="Output file for public key")
+    p_gen.add_argument("--format", choices=["pem", "bin"], default="pem",
+                       help="Key file format: our PEM or the binary container (default: pem)")
     p_gen.set_defaults(func=cmd_genkey)
 
     p_enc = sub.add_parser("encrypt", help="Encrypt with public key")
-    p_enc.add_argument("--pub", required=True, help="Public key PEM file")
+    p_enc.add_argument("--pub", required=True, help="Public key file (PEM or binary)")
     p_enc.add_argument("-i", "--input", required=True, help="Input file (plaintext)")
     p_enc.add_argument("-o", "--output", help="Output file (ciphertext)")
     p_enc.add_argument("--padding", choices=["oaep", "pkcs1v15", "raw"], default="oaep", help="Padding scheme")
@@ -99,7 +116,7 @@ def main():
     p_enc.set_defaults(func=cmd_encrypt)
 
     p_dec = sub.add_parser("decrypt", help="Decrypt with private key")
-    p_dec.add_argument("--priv", required=True, help="Private key PEM file")
+    p_dec.add_argument("--priv", required=True, help="Private key file (PEM or binary)")
     p_dec.add_argument("-i", "--input", required=True, help="Input file (ciphertext)")
     p_dec.add_argument("-o", "--output", help="Output file (plaintext)")
     p_dec.add_argument("--padding", choices=["oaep", "pkcs1v15", "raw"], default="oaep", help="Padding scheme")
@@ -107,7 +124,7 @@ def main():
     p_dec.set_defaults(func=cmd_decrypt)
 
     p_sig = sub.add_parser("sign", help="Sign with private key")
-    p_sig.add_argument("--priv", required=True, help="Private key PEM file")
+    p_sig.add_argument("--priv", required=True, help="Private key file (PEM or binary)")
     p_sig.add_argument("-i", "--input", required=True, help="Input file (message)")
     p_sig.add_argument("-o", "--output", help="Output file (signature)")
     p_sig.add_argument("--padding", choices=["pss", "raw"], default="pss", help="Signature scheme")
@@ -115,7 +132,7 @@ def main():
     p_sig.set_defaults(func=cmd_sign)
 
     p_ver = sub.add_parser("verify", help="Verify signature with public key")
-    p_ver.add_argument("--pub", required=True, help="Public key PEM file")
+    p_ver.add_argument("--pub", required=True, help="Public key file (PEM or binary)")
     p_ver.add_argument("-i", "--input", required=True, help="Input file (message)")
     p_ver.add_argument("--signature", required=True, help="Signature file")
     p_ver.add_argument("--padding", choices=["pss", "raw"], default="pss", help="Signature scheme")
@@ -123,6 +140,8 @@ def main():
     p_ver.set_defaults(func=cmd_verify)
 
     args = parser.parse_args()
+    if getattr(args, "workers", 1) < 1:
+        parser.error("--workers must be >= 1")
     args.func(args)
 
 if __name__ == "__main__":
@@ -0,0 +1,72 @@
+"""Per-key RSA contexts, cached by key.
+
+A context holds what about a key does not depend on the message: the
+modulus byte length k and emBits for PSS, so repeated operations with one
+key skip that setup. The exponentiation itself stays the built-in pow() (via
+crtPow for private keys with CRT parameters): its C sliding window already
+beats any table we could build in Python.
+"""
+from functools import lru_cache
+from typing import Optional
+from .crt import CrtKey, crtPow
+from .rsa_core import _encryptWith, _decryptWith, _signWith, _verifyWith, rsaVerifyMany
+
+KEY_CONTEXT_CACHE_SIZE = 64
+
+class RsaKeyContext:
+    """Precomputed per-key values plus the RSA operations that use them."""
+    __slots__ = ("n", "e", "d", "crt", "k", "emBits")
+
+    def __init__(self, n: int, e: Optional[int] = None, d: Optional[int] = None,
+                 crt: Optional[CrtKey] = None) -> None:
+        self.n = n
+        self.e = e
+        self.d = d
+        self.crt = crt
+        self.k = (n.bit_length() + 7) // 8
+        self.emBits = n.bit_length() - 1
+
+    def __repr__(self) -> str:
+        return f"RsaKeyContext(<{self.n.bit_length()}-bit {'private' if self.d is not None else 'public'} key>)"
+
+    def publicPow(self, x: int) -> int:
+        if self.e is None:
+            raise ValueError("Public exponent required")
+        return pow(x, self.e, self.n)
+
+    def privatePow(self, x: int) -> int:
+        if self.crt is not None:
+            return crtPow(x, self.crt)
+        if self.d is None:
+            raise ValueError("Private key required")
+        return pow(x, self.d, self.n)
+
+    def encrypt(self, plaintext: bytes, padding: str = "oaep") -> bytes:
+        return _encryptWith(plaintext, self.k, self.publicPow, padding)
+
+    def decrypt(self, ciphertext: bytes, padding: str = "oaep") -> bytes:
+        return _decryptWith(ciphertext, self.k, self.privatePow, padding)
+
+    def sign(self, message: bytes, padding: str = "pss") -> bytes:
+        return _signWith(message, self.k, self.emBits, self.privatePow, padding)
+
+    def verify(self, message: bytes, signature: bytes, padding: str = "pss") -> bool:
+        return _verifyWith(message, signature, self.k, self.emBits, self.publicPow, padding)
+
+    def verify_many(self, messages: list[bytes], signatures: list[bytes], padding: str = "pss",
+                    workers: int = 1) -> list[bool]:
+        if self.e is None:
+            raise ValueError("Public exponent required")
+        return rsaVerifyMany(messages, signatures, self.n, self.e, padding=padding, workers=workers)
+
+@lru_cache(maxsize=KEY_CONTEXT_CACHE_SIZE)
+def getKeyContext(n: int, e: Optional[int] = None, d: Optional[int] = None,
+                  crt: Optional[CrtKey] = None) -> RsaKeyContext:
+    """Return the (cached) context for a key; keyed by modulus and exponents."""
+    return RsaKeyContext(n, e, d, crt)
+
+def keyContextCacheInfo():
+    return getKeyContext.cache_info()
+
+def clearKeyContextCache() -> None:
+    getKeyContext.cache_clear()
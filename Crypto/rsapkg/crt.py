@@ -0,0 +1,28 @@
+"""Chinese Remainder Theorem parameters and private-key exponentiation (RFC 8017, 5.1.2)."""
+from dataclasses import dataclass
+from .mathops import modinv
+
+@dataclass(frozen=True)
+class CrtKey:
+    """CRT form of a private key: two half-size exponentiations instead of one full one."""
+    p: int     # first prime factor of n
+    q: int     # second prime factor of n
+    dP: int    # d mod (p-1)
+    dQ: int    # d mod (q-1)
+    qInv: int  # q^-1 mod p
+
+    @staticmethod
+    def fromPrimes(p: int, q: int, d: int) -> "CrtKey":
+        return CrtKey(p=p, q=q, dP=d % (p - 1), dQ=d % (q - 1), qInv=modinv(q, p))
+
+    def check(self, n: int) -> None:
+        """Raise ValueError if these parameters do not belong to modulus n."""
+        if self.p * self.q != n or (self.q * self.qInv) % self.p != 1:
+            raise ValueError("CRT parameters do not match the modulus")
+
+def crtPow(x: int, crt: CrtKey) -> int:
+    """x^d mod n via CRT and Garner recombination."""
+    m1 = pow(x % crt.p, crt.dP, crt.p)
+    m2 = pow(x % crt.q, crt.dQ, crt.q)
+    h = (crt.qInv * (m1 - m2)) % crt.p
+    return m2 + h * crt.q
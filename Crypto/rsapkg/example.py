@@ -5,7 +5,7 @@ from Crypto.rsapkg.rsa_core import rsaEncrypt, rsaDecrypt, rsaSign, rsaVerify
 
 def main():
     kp = generateKeyPair(bits=1024)
-    priv_pem = savePrivateKeyPem(kp)
+    priv_pem = savePrivateKeyPem(kp.n, kp.d, kp.crt)
     pub_pem = savePublicKeyPem(kp.n, kp.e)
     print(priv_pem)
     print(pub_pem)
@@ -14,10 +14,10 @@ def main():
     ct = rsaEncrypt(msg, kp.n, kp.e, padding="oaep")
     print("cipher (b64):", base64.b64encode(ct).decode())
 
-    pt = rsaDecrypt(ct, kp.n, kp.d, padding="oaep")
+    pt = rsaDecrypt(ct, kp.n, kp.d, padding="oaep", crt=kp.crt)
     print("plain:", pt)
 
-    sig = rsaSign(msg, kp.n, kp.d, padding="pss")
+    sig = rsaSign(msg, kp.n, kp.d, padding="pss", crt=kp.crt)
     print("sig (b64):", base64.b64encode(sig).decode())
 
     print("verify:", rsaVerify(msg, sig, kp.n, kp.e, padding="pss"))
@@ -0,0 +1,90 @@
+"""Compact binary key container (DER-like, but NOT DER).
+
+Layout, all integers big-endian:
+    magic   4 bytes  b"RSAK"
+    version 1 byte   1
+    flags   1 byte   bit 0: e present, bit 1: d present, bit 2: CRT present
+    fields  n, then e, d, p, q, dP, dQ, qInv when their flag is set;
+            each is a 4-byte length followed by the integer's bytes.
+
+Unlike the PEM helpers there is no base64, JSON or hex step: loading is a
+handful of int.from_bytes() calls. Fields are read on demand, so a public
+load of a private file never touches the private integers.
+"""
+import struct
+from typing import Optional, Tuple
+from .crt import CrtKey
+
+MAGIC = b"RSAK"
+VERSION = 1
+HAS_E, HAS_D, HAS_CRT = 0x01, 0x02, 0x04
+
+_HEADER = struct.Struct(">4sBB")
+_LENGTH = struct.Struct(">I")
+_CRT_FIELDS = ("p", "q", "dP", "dQ", "qInv")
+
+def isKeyBinary(data: bytes) -> bool:
+    return data[:4] == MAGIC
+
+def _putInt(out: bytearray, x: int) -> None:
+    raw = x.to_bytes((x.bit_length() + 7) // 8, "big")
+    out += _LENGTH.pack(len(raw))
+    out += raw
+
+def saveKeyBinary(n: int, e: Optional[int] = None, d: Optional[int] = None,
+                  crt: Optional[CrtKey] = None) -> bytes:
+    """Serialize whichever key components are given; n is required."""
+    flags = (HAS_E if e is not None else 0) | (HAS_D if d is not None else 0) | (HAS_CRT if crt is not None else 0)
+    out = bytearray(_HEADER.pack(MAGIC, VERSION, flags))
+    _putInt(out, n)
+    if e is not None:
+        _putInt(out, e)
+    if d is not None:
+        _putInt(out, d)
+    if crt is not None:
+        for name in _CRT_FIELDS:
+            _putInt(out, getattr(crt, name))
+    return bytes(out)
+
+class _Reader:
+    """Walks the length-prefixed fields of a key container."""
+
+    def __init__(self, data: bytes) -> None:
+        if len(data) < _HEADER.size:
+            raise ValueError("Key container too short")
+        magic, version, flags = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Not a binary RSA key container")
+        if version != VERSION:
+            raise ValueError(f"Unsupported key container version {version}")
+        self.flags = flags
+        self._view = memoryview(data)
+        self._pos = _HEADER.size
+
+    def take(self) -> int:
+        end = self._pos + _LENGTH.size
+        if end > len(self._view):
+            raise ValueError("Truncated key container")
+        (length,) = _LENGTH.unpack_from(self._view, self._pos)
+        start, self._pos = end, end + length
+        if self._pos > len(self._view):
+            raise ValueError("Truncated key container")
+        return int.from_bytes(self._view[start:self._pos], "big")
+
+def loadKeyBinary(data: bytes) -> Tuple[int, Optional[int], Optional[int], Optional[CrtKey]]:
+    """Parse a container back to (n, e, d, crt); absent components are None."""
+    r = _Reader(data)
+    n = r.take()
+    e = r.take() if r.flags & HAS_E else None
+    d = r.take() if r.flags & HAS_D else None
+    crt = None
+    if r.flags & HAS_CRT:
+        crt = CrtKey(*(r.take() for _ in _CRT_FIELDS))
+        crt.check(n)
+    return n, e, d, crt
+
+def loadPublicKeyBinary(data: bytes) -> Tuple[int, Optional[int]]:
+    """Only (n, e); the private fields of a private container are not decoded."""
+    r = _Reader(data)
+    n = r.take()
+    return n, (r.take() if r.flags & HAS_E else None)
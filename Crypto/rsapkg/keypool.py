@@ -0,0 +1,183 @@
+"""Pool of pre-generated RSA key pairs, refilled by a background thread.
+
+get() pops a ready key pair in O(1); a daemon thread generates replacements
+whenever the pool is below its capacity. take() pops several at once and
+never falls back to generating on the caller's thread. With `path`, the pool is persisted
+(atomically, mode 0600) after every change, so keys generated before a
+restart are still available afterwards and a key handed out is never handed
+out again. The file holds PRIVATE keys: keep it next to the other key files.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, List, Optional
+from .keys import RsaKeyPair, generateKeyPair
+from .pem import loadPrivateKeyPemCrt
+
+@dataclass(frozen=True)
+class KeyPoolStats:
+    depth: int                 # key pairs ready right now
+    capacity: int              # target depth
+    generated: int             # key pairs generated by this pool object (background + inline)
+    served: int                # key pairs handed out by get()
+    misses: int                # get() calls that found the pool empty
+    avgGenerateSeconds: float  # mean time to generate one key pair
+    refillRate: float          # key pairs per second while the refill thread is busy
+
+class KeyPool:
+    """Keeps `size` freshly generated key pairs ready; see the module docstring."""
+
+    def __init__(self, size: int = 4, bits: int = 2048, e: int = 65537, path: Optional[str] = None,
+                 workers: int = 1, autostart: bool = True) -> None:
+        if size < 1:
+            raise ValueError("size must be >= 1")
+        self.size = size
+        self.bits = bits
+        self.e = e
+        self.path = path
+        self.workers = workers
+        self._keys: Deque[RsaKeyPair] = deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._generated = 0
+        self._served = 0
+        self._misses = 0
+        self._generateSeconds = 0.0
+        self._load()
+        if autostart:
+            self.start()
+
+    # ---------- persistence ----------
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                obj = json.load(f)
+            if obj.get("bits") != self.bits or obj.get("e") != self.e:
+                return  # pool of another key size: start empty, it is overwritten on refill
+            for pem in obj.get("keys", []):
+                n, d, crt = loadPrivateKeyPemCrt(pem)
+                self._keys.append(RsaKeyPair(n=n, e=self.e, d=d, crt=crt))
+        except (OSError, ValueError, KeyError, TypeError):
+            self._keys.clear()  # unreadable pool file: regenerate rather than fail
+
+    def _save(self) -> None:
+        # called with self._cond held
+        if not self.path:
+            return
+        obj = {"bits": self.bits, "e": self.e, "keys": [kp.to_private_pem() for kp in self._keys]}
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = self.path + ".tmp"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(obj, f)
+        os.replace(tmp, self.path)
+
+    # ---------- background refill ----------
+    def start(self) -> None:
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._refill, name="rsa-keypool", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop refilling; a key pair being generated is finished (and kept) first."""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def __enter__(self) -> "KeyPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _generate(self) -> RsaKeyPair:
+        start = time.perf_counter()
+        kp = generateKeyPair(bits=self.bits, e=self.e, workers=self.workers)
+        with self._cond:
+            self._generateSeconds += time.perf_counter() - start
+            self._generated += 1
+        return kp
+
+    def _refill(self) -> None:
+        while True:
+            with self._cond:
+                while self._running and len(self._keys) >= self.size:
+                    self._cond.wait()
+                if not self._running:
+                    return
+            kp = self._generate()  # outside the lock: get() stays instant meanwhile
+            with self._cond:
+                self._keys.append(kp)
+                self._save()
+                self._cond.notify_all()
+
+    # ---------- consumers ----------
+    def get(self, timeout: Optional[float] = 0) -> RsaKeyPair:
+        """Pop a ready key pair. If the pool is empty, wait up to `timeout` seconds
+        (None = until one is ready) for the refill thread, then generate inline."""
+        with self._cond:
+            if not self._keys:
+                self._misses += 1
+                if self._running and timeout != 0:
+                    self._cond.wait_for(lambda: self._keys, timeout)
+            if self._keys:
+                kp = self._keys.popleft()
+                self._served += 1
+                self._save()  # a served key must not come back after a restart
+                self._cond.notify_all()
+                return kp
+        kp = self._generate()
+        with self._cond:
+            self._served += 1
+            self._cond.notify_all()
+        return kp
+
+    def take(self, count: int = 1, timeout: Optional[float] = 0) -> Optional[List[RsaKeyPair]]:
+        """Pop `count` ready key pairs together, waiting up to `timeout` seconds for the
+        refill thread. Never generates inline: returns None (and takes nothing) if they
+        are not ready in time, so a UI thread can report progress instead of blocking."""
+        if count > self.size:
+            raise ValueError("count must be <= size")
+        with self._cond:
+            if len(self._keys) < count:
+                self._misses += 1
+                if self._running and timeout != 0:
+                    self._cond.wait_for(lambda: len(self._keys) >= count, timeout)
+            if len(self._keys) < count:
+                return None
+            kps = [self._keys.popleft() for _ in range(count)]
+            self._served += count
+            self._save()
+            self._cond.notify_all()
+            return kps
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._keys)
+
+    def stats(self) -> KeyPoolStats:
+        with self._cond:
+            avg = self._generateSeconds / self._generated if self._generated else 0.0
+            return KeyPoolStats(
+                depth=len(self._keys),
+                capacity=self.size,
+                generated=self._generated,
+                served=self._served,
+                misses=self._misses,
+                avgGenerateSeconds=avg,
+                refillRate=1.0 / avg if avg else 0.0,
+            )
@@ -1,8 +1,10 @@
 """Key data class and RSA key generation."""
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from dataclasses import dataclass
-from typing import Optional
-from .mathops import genPrime, modinv
+from typing import List, Optional
+from .mathops import findPrimeInWindow, genPrime, modinv
 from .pem import savePrivateKeyPem, savePublicKeyPem
+from .crt import CrtKey
 
 @dataclass
 class RsaKeyPair:
@@ -10,23 +12,61 @@ class RsaKeyPair:
     n: Optional[int] = None  # modulus (n = p * q)
     e: Optional[int] = None  # public exponent
     d: Optional[int] = None  # private exponent d = e^-1 mod (p-1)(q-1)
+    crt: Optional[CrtKey] = None  # p, q, dP, dQ, qInv for fast private-key operations
 
     def to_private_pem(self) -> str:
-        return savePrivateKeyPem(self.n, self.d)
+        return savePrivateKeyPem(self.n, self.d, self.crt)
 
     def to_public_pem(self) -> str:
         return savePublicKeyPem(self.n, self.e)
 
-def generateKeyPair(bits: int = 2048, e: int = 65537) -> RsaKeyPair | None:
+def _findPrimesParallel(sizes: List[int], e: int, workers: int) -> List[int]:
+    """One prime per entry of `sizes`, searched by `workers` processes at once.
+
+    Each task sieves and tests a single window, so a finished search never
+    waits for long-running stragglers; idle workers get the next window of
+    whichever size is still missing.
+    """
+    found: List[Optional[int]] = [None] * len(sizes)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+        def refill():
+            missing = [i for i, prime in enumerate(found) if prime is None]
+            while missing and len(pending) < workers:
+                i = missing[len(pending) % len(missing)]
+                pending[pool.submit(findPrimeInWindow, sizes[i], e)] = i
+        refill()
+        while any(prime is None for prime in found):
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                i = pending.pop(future)
+                prime = future.result()
+                if prime is None or prime in found:
+                    continue
+                # any free slot of the same size will do
+                slot = next((j for j, size in enumerate(sizes) if found[j] is None and size == sizes[i]), None)
+                if slot is not None:
+                    found[slot] = prime
+            refill()
+        for future in pending:
+            future.cancel()
+    return found
+
+def generateKeyPair(bits: int = 2048, e: int = 65537, workers: int = 1) -> RsaKeyPair | None:
     """Generate an RSA key pair of the given size.
     - bits: modulus size in bits (≥1024 recommended 2048+)
-    - e: public exponent (65537 default)"""
+    - e: public exponent (65537 default)
+    - workers: processes searching for p and q concurrently (1 = in this process)"""
     if bits < 1024:
         raise ValueError("Key size should be >= 1024 bits for security.")
     half = bits // 2
     while True:
-        p = genPrime(half)
-        q = genPrime(bits - half)
+        # primes are drawn with gcd(e, p-1) == 1, so phi is always invertible mod e
+        if workers > 1:
+            p, q = _findPrimesParallel([half, bits - half], e, workers)
+        else:
+            p = genPrime(half, e)
+            q = genPrime(bits - half, e)
         if p == q:
             continue
         n = p * q
@@ -34,4 +74,6 @@ def generateKeyPair(bits: int = 2048, e: int = 65537) -> RsaKeyPair | None:
         if phi % e == 0:
             continue
         d = modinv(e, phi)
-        return RsaKeyPair(n=n, e=e, d=d)
+        if p < q:
+            p, q = q, p  # RFC 8017 convention, p > q
+        return RsaKeyPair(n=n, e=e, d=d, crt=CrtKey.fromPrimes(p, q, d))
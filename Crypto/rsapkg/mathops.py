@@ -1,13 +1,19 @@
 """Basic number-theory helpers for RSA: modular inverse and prime generation."""
+import math
 import secrets
+from typing import Optional
 
 def egcd(a: int, b: int):
     """Extended Euclidean Algorithm.
-    Returns (g, x, y) such that a*x + b*y = g = gcd(a, b)."""
-    if b == 0:
-        return (a, 1, 0)
-    g, x1, y1 = egcd(b, a % b)
-    return (g, y1, x1 - (a // b) * y1)
+    Returns (g, x, y) such that a*x + b*y = g = gcd(a, b).
+    Iterative, so 2048-bit operands (qInv of 4096-bit keys) do not hit the recursion limit."""
+    x0, y0, x1, y1 = 1, 0, 0, 1
+    while b:
+        quot, r = divmod(a, b)
+        a, b = b, r
+        x0, x1 = x1, x0 - quot * x1
+        y0, y1 = y1, y0 - quot * y1
+    return (a, x0, y0)
 
 def modinv(a: int, n: int) -> int:
     """Compute modular inverse of a modulo n (a^{-1} mod n)."""
@@ -44,15 +50,62 @@ def isProbablePrime(n: int, rounds: int = 40) -> bool:
         return False
     return True
 
-def genPrime(bits: int) -> int:
-    """Generate a random probable prime of the given bit length."""
+def _smallPrimes(limit: int) -> list[int]:
+    sieve = bytearray([1]) * limit
+    sieve[0:2] = b"\x00\x00"
+    for i in range(2, math.isqrt(limit) + 1):
+        if sieve[i]:
+            sieve[i * i::i] = bytes(len(range(i * i, limit, i)))
+    return [i for i in range(3, limit) if sieve[i]]  # odd primes; candidates are odd anyway
+
+# odd primes below 2^15 (~3500): candidates sharing one of these factors never reach Miller-Rabin
+SMALL_PRIMES = _smallPrimes(1 << 15)
+# offsets base + 2*k, k < SIEVE_WINDOW, sieved together; ~10 primes expected per window at 1024 bits
+SIEVE_WINDOW = 4096
+
+def mrRounds(bits: int) -> int:
+    """Miller-Rabin rounds for a random candidate of `bits` bits, error < 2^-100
+    (FIPS 186-4, Table C.3); larger candidates need fewer rounds."""
+    if bits >= 1536:
+        return 4
+    if bits >= 1024:
+        return 5
+    if bits >= 512:
+        return 7
+    return 40
+
+def findPrimeInWindow(bits: int, e: Optional[int] = None, window: int = SIEVE_WINDOW) -> Optional[int]:
+    """Sieve one window of odd candidates starting at a random `bits`-bit base and
+    return the first probable prime in it (with gcd(e, p-1) == 1 if e is given), or None.
+
+    The top two bits are set, so the product of two such primes has exactly
+    2*bits bits. Each small prime marks its multiples in the window with one
+    slice assignment: base + 2k == 0 (mod sp) exactly when k == -base/2 (mod sp).
+    """
     if bits < 16:
         raise ValueError("bits too small")
-    while True:
-        cand = secrets.randbits(bits) | 1
-        cand |= (1 << (bits - 1))
-        if isProbablePrime(cand):
+    base = secrets.randbits(bits) | (3 << (bits - 2)) | 1
+    window = min(window, ((1 << bits) - base) // 2 + 1)  # stay within `bits` bits
+    alive = bytearray([1]) * window
+    for sp in SMALL_PRIMES:
+        k0 = (-base * ((sp + 1) >> 1)) % sp
+        if k0 < window:
+            alive[k0::sp] = bytes(len(range(k0, window, sp)))
+    rounds = mrRounds(bits)
+    k = alive.find(1)
+    while k != -1:
+        cand = base + 2 * k
+        if (e is None or math.gcd(e, cand - 1) == 1) and isProbablePrime(cand, rounds):
             return cand
+        k = alive.find(1, k + 1)
+    return None
+
+def genPrime(bits: int, e: Optional[int] = None) -> int:
+    """Generate a random probable prime of the given bit length (sieved windows of candidates)."""
+    while True:
+        prime = findPrimeInWindow(bits, e)
+        if prime is not None:
+            return prime
 
 if __name__ == "__main__":
     # Simple test
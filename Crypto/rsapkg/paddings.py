@@ -4,8 +4,10 @@ Implemented using our pure-Python SHA256 class (sha256pkg.Sha256).
 """
 
 import secrets
+from functools import lru_cache
 from .utils import ceilDiv
 from Crypto.sha256pkg import Sha256
+from Crypto.fastbytes import xorBytes, randomNonzero
 
 
 def mgf1(seed: bytes, length: int) -> bytes:
@@ -17,13 +19,30 @@ def mgf1(seed: bytes, length: int) -> bytes:
         A mask of `length` bytes derived from the seed.
     """
     hlen = 32  # SHA256 digest size
+    # absorb the seed once; each counter only costs its own final block(s)
+    prefix = Sha256(seed)
     T = bytearray()
     for counter in range(ceilDiv(length, hlen)):
         C = counter.to_bytes(4, "big")
-        T.extend(Sha256.hash(seed + C))
+        T.extend(prefix.digestWith(C))
     return bytes(T[:length])
 
 
+def mgf1Many(seeds: list[bytes], length: int) -> list[bytes]:
+    """mgf1(seed, length) for many seeds; every (seed, counter) hash goes through one Sha256.hashMany."""
+    hlen = 32
+    counters = [counter.to_bytes(4, "big") for counter in range(ceilDiv(length, hlen))]
+    digests = Sha256.hashMany([seed + C for seed in seeds for C in counters])
+    per = len(counters)
+    return [b"".join(digests[i * per:(i + 1) * per])[:length] for i in range(len(seeds))]
+
+
+@lru_cache(maxsize=32)
+def labelHash(label: bytes) -> bytes:
+    """SHA256(label) for OAEP; the label is almost always the same (empty), so memoize it."""
+    return Sha256.hash(label)
+
+
 # ---------------- RSAES-OAEP ----------------
 def oaepEncode(message: bytes, k: int, label: bytes = b"") -> bytes:
     """Encode message using OAEP and SHA256.
@@ -34,7 +53,7 @@ def oaepEncode(message: bytes, k: int, label: bytes = b"") -> bytes:
     Returns:
         Encoded message block ready for RSA encryption.
     """
-    h = Sha256.hash(label)
+    h = labelHash(bytes(label))
     hlen = len(h)
     mlen = len(message)
     if mlen > k - 2 * hlen - 2:
@@ -43,9 +62,9 @@ def oaepEncode(message: bytes, k: int, label: bytes = b"") -> bytes:
     DB = h + PS + b"\x01" + message
     seed = secrets.token_bytes(hlen)
     dbMask = mgf1(seed, k - hlen - 1)
-    maskedDB = bytes(a ^ b for a, b in zip(DB, dbMask))
+    maskedDB = xorBytes(DB, dbMask)
     seedMask = mgf1(maskedDB, hlen)
-    maskedSeed = bytes(a ^ b for a, b in zip(seed, seedMask))
+    maskedSeed = xorBytes(seed, seedMask)
     return b"\x00" + maskedSeed + maskedDB
 
 
@@ -60,7 +79,7 @@ def oaepDecode(EM: bytes, k: int, label: bytes = b"") -> bytes:
     Raises:
         ValueError: if the padding is invalid.
     """
-    h = Sha256.hash(label)
+    h = labelHash(bytes(label))
     hlen = len(h)
     if len(EM) != k or k < 2 * hlen + 2:
         raise ValueError("decryption error")
@@ -68,9 +87,9 @@ def oaepDecode(EM: bytes, k: int, label: bytes = b"") -> bytes:
     maskedSeed = EM[1:1 + hlen]
     maskedDB = EM[1 + hlen:]
     seedMask = mgf1(maskedDB, hlen)
-    seed = bytes(a ^ b for a, b in zip(maskedSeed, seedMask))
+    seed = xorBytes(maskedSeed, seedMask)
     dbMask = mgf1(seed, k - hlen - 1)
-    DB = bytes(a ^ b for a, b in zip(maskedDB, dbMask))
+    DB = xorBytes(maskedDB, dbMask)
     lhash = DB[:hlen]
     if Y != 0 or lhash != h:
         raise ValueError("decryption error")
@@ -88,11 +107,7 @@ def pkcs1v15Pad(message: bytes, k: int) -> bytes:
     ps_len = k - len(message) - 3
     if ps_len < 8:
         raise ValueError("message too long")
-    PS = bytearray()
-    while len(PS) < ps_len:
-        b = secrets.randbelow(255) + 1
-        PS.append(b)
-    return b"\x00\x02" + bytes(PS) + b"\x00" + message
+    return b"\x00\x02" + randomNonzero(ps_len) + b"\x00" + message
 
 
 def pkcs1v15Unpad(EM: bytes) -> bytes:
@@ -126,53 +141,77 @@ def pssEncode(message: bytes, emBits: int, saltLen: int = 32) -> bytes:
     PS = b"\x00" * (emLen - saltLen - hlen - 2)
     DB = PS + b"\x01" + salt
     dbMask = mgf1(Hm, emLen - hlen - 1)
-    maskedDB = bytes(a ^ b for a, b in zip(DB, dbMask))
+    maskedDB = xorBytes(DB, dbMask)
     unused = 8 * emLen - emBits
     if unused:
         maskedDB = bytes([maskedDB[0] & (0xFF >> unused)]) + maskedDB[1:]
     return maskedDB + Hm + b"\xbc"
 
-def pssVerify(message: bytes, EM: bytes, emBits: int, saltLen: int = 32) -> bool:
-    """Verify PSS-encoded block using SHA256.
-        Args:
-            message: original message
-            EM: encoded block to verify
-            emBits: modulus bit length - 1
-            saltLen: expected salt length
-        Returns:
-            True if verification passes, False otherwise.
-        """
+def _pssRecoverSalt(EM: bytes, emBits: int, saltLen: int, dbMask: bytes | None = None) -> tuple[bytes, bytes] | None:
+    """Structural PSS checks (RFC 8017, 9.1.2 steps 3-10); returns (H, salt), or None if EM is malformed.
+    `dbMask` may be passed in when it was already computed (mgf1Many)."""
     hlen = 32
     emLen = ceilDiv(emBits, 8)
     if emLen < hlen + saltLen + 2 or len(EM) != emLen or EM[-1] != 0xbc:
-        return False
+        return None
 
     maskedDB = EM[:emLen - hlen - 1]
     Hm = EM[emLen - hlen - 1:-1]
 
     unused = 8 * emLen - emBits
     if unused and (maskedDB[0] & (~(0xFF >> unused))) != 0:
-        return False
+        return None
 
-    dbMask = mgf1(Hm, emLen - hlen - 1)
-    DB = bytes(a ^ b for a, b in zip(maskedDB, dbMask))
+    if dbMask is None:
+        dbMask = mgf1(Hm, emLen - hlen - 1)
+    DB = xorBytes(maskedDB, dbMask)
     if unused:
         DB = bytes([DB[0] & (0xFF >> unused)]) + DB[1:]
 
     # ✅ Xác định đúng vị trí theo chuẩn
     ps_len = emLen - hlen - saltLen - 2
     if ps_len < 0:
-        return False
+        return None
     if DB[:ps_len] != b"\x00" * ps_len:
-        return False
+        return None
     if DB[ps_len] != 0x01:
-        return False
+        return None
     salt = DB[ps_len + 1 : ps_len + 1 + saltLen]
     if len(salt) != saltLen:
-        return False
+        return None
+    return Hm, salt
 
+def pssVerify(message: bytes, EM: bytes, emBits: int, saltLen: int = 32) -> bool:
+    """Verify PSS-encoded block using SHA256.
+        Args:
+            message: original message
+            EM: encoded block to verify
+            emBits: modulus bit length - 1
+            saltLen: expected salt length
+        Returns:
+            True if verification passes, False otherwise.
+        """
+    recovered = _pssRecoverSalt(EM, emBits, saltLen)
+    if recovered is None:
+        return False
+    Hm, salt = recovered
     mHash = Sha256.hash(message)
     M = b"\x00" * 8 + mHash + salt
     Hm2 = Sha256.hash(M)
     return Hm == Hm2
 
+def pssVerifyMany(messages: list[bytes], EMs: list[bytes], emBits: int, saltLen: int = 32) -> list[bool]:
+    """pssVerify for many (message, EM) pairs; MGF1 and both SHA256 passes go through Sha256.hashMany."""
+    hlen = 32
+    emLen = ceilDiv(emBits, 8)
+    # the mask seed H sits at a fixed position, so every mask can be generated in one batch
+    seeds = [EM[emLen - hlen - 1:-1] if len(EM) == emLen else b"" for EM in EMs]
+    masks = mgf1Many(seeds, emLen - hlen - 1) if emLen > hlen + 1 else [None] * len(EMs)
+    recovered = [_pssRecoverSalt(EM, emBits, saltLen, mask) for EM, mask in zip(EMs, masks)]
+    live = [i for i, r in enumerate(recovered) if r is not None]
+    mHashes = Sha256.hashMany([messages[i] for i in live])
+    Hm2s = Sha256.hashMany([b"\x00" * 8 + mHash + recovered[i][1] for i, mHash in zip(live, mHashes)])
+    results = [False] * len(EMs)
+    for i, Hm2 in zip(live, Hm2s):
+        results[i] = recovered[i][0] == Hm2
+    return results
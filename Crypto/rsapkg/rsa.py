@@ -1,8 +1,47 @@
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional
 from .keys import RsaKeyPair, generateKeyPair
-from .pem import savePrivateKeyPem, loadPrivateKeyPem, savePublicKeyPem, loadPublicKeyPem
-from .rsa_core import rsaEncrypt, rsaDecrypt, rsaSign, rsaVerify
+from .pem import savePrivateKeyPem, loadPrivateKeyPemCrt, savePublicKeyPem, loadPublicKeyPem
+from .crt import CrtKey
+from .keybin import saveKeyBinary, loadKeyBinary, loadPublicKeyBinary
+from .utils import i2osp
+from Crypto.sha256pkg import Sha256
+from .context import RsaKeyContext, getKeyContext
+
+# Parsed-key cache: the same PEM/container text always yields the same numbers,
+# so reloading a key (per request, on reconnect) is one dict lookup. Each call
+# still returns a fresh Rsa, callers may mutate theirs freely.
+PARSED_KEY_CACHE_SIZE = 128
+
+@lru_cache(maxsize=PARSED_KEY_CACHE_SIZE)
+def _parsePrivatePem(pem: str):
+    return loadPrivateKeyPemCrt(pem)
+
+@lru_cache(maxsize=PARSED_KEY_CACHE_SIZE)
+def _parsePublicPem(pem: str):
+    return loadPublicKeyPem(pem)
+
+@lru_cache(maxsize=PARSED_KEY_CACHE_SIZE)
+def _parseKeyBytes(data: bytes):
+    return loadKeyBinary(data)
+
+@lru_cache(maxsize=PARSED_KEY_CACHE_SIZE)
+def _parsePublicKeyBytes(data: bytes):
+    return loadPublicKeyBinary(data)
+
+def parsedKeyCacheInfo() -> dict:
+    """Hit/miss statistics of the parsed-key caches, per input format."""
+    return {"private_pem": _parsePrivatePem.cache_info(),
+            "public_pem": _parsePublicPem.cache_info(),
+            "binary": _parseKeyBytes.cache_info(),
+            "public_binary": _parsePublicKeyBytes.cache_info()}
+
+def clearParsedKeyCache() -> None:
+    _parsePrivatePem.cache_clear()
+    _parsePublicPem.cache_clear()
+    _parseKeyBytes.cache_clear()
+    _parsePublicKeyBytes.cache_clear()
 
 @dataclass
 class Rsa:
@@ -10,40 +49,72 @@ class Rsa:
     n: Optional[int] = None # modulus (n = p * q)
     e: Optional[int] = None # public exponent
     d: Optional[int] = None # private exponent d = e^-1 mod (p-1)(q-1)
+    crt: Optional[CrtKey] = None # CRT parameters; None for keys saved without them
 
     @staticmethod
-    def generate(bits: int = 2048, e: int = 65537) -> "Rsa":
-        kp = generateKeyPair(bits=bits, e=e)
-        return Rsa(n=kp.n, e=kp.e, d=kp.d)
+    def generate(bits: int = 2048, e: int = 65537, workers: int = 1) -> "Rsa":
+        """New key pair; workers > 1 searches for p and q in a process pool."""
+        kp = generateKeyPair(bits=bits, e=e, workers=workers)
+        return Rsa(n=kp.n, e=kp.e, d=kp.d, crt=kp.crt)
 
     @staticmethod
     def from_private_pem(pem: str) -> "Rsa":
-        n, d = loadPrivateKeyPem(pem)
-        return Rsa(n=n, d=d)
+        n, d, crt = _parsePrivatePem(pem)
+        return Rsa(n=n, d=d, crt=crt)
 
     @staticmethod
     def from_public_pem(pem: str) -> "Rsa":
-        n, e = loadPublicKeyPem(pem)
+        n, e = _parsePublicPem(pem)
         return Rsa(n=n, e=e)
 
+    @staticmethod
+    def from_key_bytes(data: bytes, private: bool = True) -> "Rsa":
+        """Load a binary container (see keybin.py); private=False reads only n and e,
+        leaving the private fields of a private container undecoded."""
+        if not private:
+            n, e = _parsePublicKeyBytes(bytes(data))
+            return Rsa(n=n, e=e)
+        n, e, d, crt = _parseKeyBytes(bytes(data))
+        return Rsa(n=n, e=e, d=d, crt=crt)
+
     def to_private_pem(self) -> str:
-        return savePrivateKeyPem(self.n, self.d)
+        return savePrivateKeyPem(self.n, self.d, self.crt)
 
     def to_public_pem(self) -> str:
         return savePublicKeyPem(self.n, self.e)
 
+    def to_key_bytes(self, private: bool = True) -> bytes:
+        """Binary container; private=False (or a public-only key) writes just n and e."""
+        if private and self.d is not None:
+            return saveKeyBinary(self.n, self.e, self.d, self.crt)
+        return saveKeyBinary(self.n, self.e)
+
+    def fingerprint(self) -> bytes:
+        """SHA-256 of the modulus: identical for the public and the private half of a key."""
+        return Sha256.hash(i2osp(self.n, (self.n.bit_length() + 7) // 8))
+
+    @property
+    def context(self) -> RsaKeyContext:
+        """Per-key precomputation, shared through the LRU in context.py."""
+        return getKeyContext(self.n, self.e, self.d, self.crt)
+
     def encrypt(self, plaintext: bytes, padding: str = "oaep") -> bytes:
-        return rsaEncrypt(plaintext, self.n, self.e, padding=padding)
+        return self.context.encrypt(plaintext, padding=padding)
 
     def decrypt(self, ciphertext: bytes, padding: str = "oaep") -> bytes:
         if self.d is None:
             raise ValueError("Private key required for decryption")
-        return rsaDecrypt(ciphertext, self.n, self.d, padding=padding)
+        return self.context.decrypt(ciphertext, padding=padding)
 
     def sign(self, message: bytes, padding: str = "pss") -> bytes:
         if self.d is None:
             raise ValueError("Private key required for signing")
-        return rsaSign(message, self.n, self.d, padding=padding)
+        return self.context.sign(message, padding=padding)
 
     def verify(self, message: bytes, signature: bytes, padding: str = "pss") -> bool:
-        return rsaVerify(message, signature, self.n, self.e, padding=padding)
+        return self.context.verify(message, signature, padding=padding)
+
+    def verify_many(self, messages: list[bytes], signatures: list[bytes], padding: str = "pss",
+                    workers: int = 1) -> list[bool]:
+        """Verify a batch of signatures made with this key; one result per (message, signature)."""
+        return self.context.verify_many(list(messages), list(signatures), padding=padding, workers=workers)
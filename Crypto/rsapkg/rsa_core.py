@@ -1,11 +1,13 @@
 """High-level RSA operations: encrypt/decrypt and sign/verify."""
+from concurrent.futures import ProcessPoolExecutor
 from .utils import i2osp, os2ip
-from .paddings import oaepEncode, oaepDecode, pkcs1v15Pad, pkcs1v15Unpad, pssEncode, pssVerify
+from .crt import CrtKey, crtPow
+from .paddings import oaepEncode, oaepDecode, pkcs1v15Pad, pkcs1v15Unpad, pssEncode, pssVerify, pssVerifyMany
 
-def rsaEncrypt(m: bytes, n: int, e: int, padding: str = "oaep") -> bytes:
-    """Encrypt message m using public key (n, e).
-    - padding: 'oaep' (default), 'pkcs1v15', or 'raw' (no padding)."""
-    k = (n.bit_length() + 7) // 8
+# below this many signatures per worker, the process pool costs more than it saves
+PARALLEL_VERIFY_MIN = 64
+
+def _encryptWith(m: bytes, k: int, public, padding: str) -> bytes:
     if padding == "oaep":
         em = oaepEncode(m, k)
     elif padding == "pkcs1v15":
@@ -16,13 +18,11 @@ def rsaEncrypt(m: bytes, n: int, e: int, padding: str = "oaep") -> bytes:
             raise ValueError("message too long")
     else:
         raise ValueError("unknown padding")
-    c = pow(os2ip(em), e, n)
+    c = public(os2ip(em))
     return i2osp(c, k)
 
-def rsaDecrypt(c: bytes, n: int, d: int, padding: str = "oaep") -> bytes:
-    """Decrypt ciphertext c using private exponent d and modulus n."""
-    k = (n.bit_length() + 7) // 8
-    m = pow(os2ip(c), d, n)
+def _decryptWith(c: bytes, k: int, private, padding: str) -> bytes:
+    m = private(os2ip(c))
     em = i2osp(m, k)
     if padding == "oaep":
         return oaepDecode(em, k)
@@ -33,28 +33,71 @@ def rsaDecrypt(c: bytes, n: int, d: int, padding: str = "oaep") -> bytes:
     else:
         raise ValueError("unknown padding")
 
-def rsaSign(message: bytes, n: int, d: int, padding: str = "pss") -> bytes:
-    """Create a signature on message using private exponent d (default PSS)."""
-    k = (n.bit_length() + 7) // 8
+def _signWith(message: bytes, k: int, emBits: int, private, padding: str) -> bytes:
     if padding == "pss":
-        em = pssEncode(message, n.bit_length() - 1)
+        em = pssEncode(message, emBits)
     elif padding == "raw":
         em = message
         if len(em) > k:
             raise ValueError("message too long")
     else:
         raise ValueError("unknown padding")
-    s = pow(os2ip(em), d, n)
+    s = private(os2ip(em))
     return i2osp(s, k)
 
-def rsaVerify(message: bytes, signature: bytes, n: int, e: int, padding: str = "pss") -> bool:
-    """Verify a signature with public key (n, e). Returns True/False."""
-    k = (n.bit_length() + 7) // 8
+def _verifyWith(message: bytes, signature: bytes, k: int, emBits: int, public, padding: str) -> bool:
     s = os2ip(signature)
-    em = i2osp(pow(s, e, n), k)
+    em = i2osp(public(s), k)
     if padding == "pss":
-        return pssVerify(message, em, n.bit_length() - 1)
+        return pssVerify(message, em, emBits)
     elif padding == "raw":
         return em == message
     else:
         raise ValueError("unknown padding")
+
+def rsaEncrypt(m: bytes, n: int, e: int, padding: str = "oaep") -> bytes:
+    """Encrypt message m using public key (n, e).
+    - padding: 'oaep' (default), 'pkcs1v15', or 'raw' (no padding)."""
+    return _encryptWith(m, (n.bit_length() + 7) // 8, lambda x: pow(x, e, n), padding)
+
+def rsaDecrypt(c: bytes, n: int, d: int, padding: str = "oaep", crt: CrtKey | None = None) -> bytes:
+    """Decrypt ciphertext c using private exponent d and modulus n.
+    With crt, the exponentiation is done mod p and mod q (about 3-4x faster)."""
+    private = (lambda x: crtPow(x, crt)) if crt is not None else (lambda x: pow(x, d, n))
+    return _decryptWith(c, (n.bit_length() + 7) // 8, private, padding)
+
+def rsaSign(message: bytes, n: int, d: int, padding: str = "pss", crt: CrtKey | None = None) -> bytes:
+    """Create a signature on message using private exponent d (default PSS), via CRT if given."""
+    private = (lambda x: crtPow(x, crt)) if crt is not None else (lambda x: pow(x, d, n))
+    return _signWith(message, (n.bit_length() + 7) // 8, n.bit_length() - 1, private, padding)
+
+def rsaVerify(message: bytes, signature: bytes, n: int, e: int, padding: str = "pss") -> bool:
+    """Verify a signature with public key (n, e). Returns True/False."""
+    return _verifyWith(message, signature, (n.bit_length() + 7) // 8, n.bit_length() - 1,
+                       lambda x: pow(x, e, n), padding)
+
+def _powMany(values: list[int], e: int, n: int) -> list[int]:
+    return [pow(v, e, n) for v in values]
+
+def rsaVerifyMany(messages: list[bytes], signatures: list[bytes], n: int, e: int,
+                  padding: str = "pss", workers: int = 1) -> list[bool]:
+    """rsaVerify over many (message, signature) pairs under one public key.
+    Returns one bool per pair, in order. The exponentiations are split across
+    `workers` processes; the PSS hashing is batched through Sha256.hashMany."""
+    if len(messages) != len(signatures):
+        raise ValueError("messages and signatures must have the same length")
+    if padding not in ("pss", "raw"):
+        raise ValueError("unknown padding")
+    k = (n.bit_length() + 7) // 8
+    values = [os2ip(sig) for sig in signatures]
+    if workers > 1 and len(values) >= workers * PARALLEL_VERIFY_MIN:
+        step = -(-len(values) // workers)
+        chunks = [values[i:i + step] for i in range(0, len(values), step)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            powered = [v for part in pool.map(_powMany, chunks, [e] * len(chunks), [n] * len(chunks)) for v in part]
+    else:
+        powered = _powMany(values, e, n)
+    ems = [i2osp(v, k) for v in powered]
+    if padding == "pss":
+        return pssVerifyMany(messages, ems, n.bit_length() - 1)
+    return [em == m for em, m in zip(ems, messages)]
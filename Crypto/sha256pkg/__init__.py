@@ -1 +1,2 @@
 from .sha256_algo import Sha256
+from .mac import HmacSha256, hmacSha256, hkdf, hkdfExtract, hkdfExpand
@@ -0,0 +1,80 @@
+"""Many independent SHA-256 computations in lockstep.
+
+Messages are padded up front and grouped by their padded block count; each
+group is one (messages, blocks, 16) uint32 array, and the 64 rounds run once
+per block index over whole columns, so the interpreter overhead of a round is
+paid once for the group instead of once per message. uint32 arithmetic wraps
+modulo 2**32 by itself, so no masking is needed. Without NumPy (or for tiny
+groups) every message goes through the scalar engine instead.
+"""
+from typing import Callable, Iterable, List
+from .padding import padTail
+from .fastcompress import _K
+
+try:
+    import numpy as np
+except ImportError:  # optional, the scalar engine needs nothing
+    np = None
+
+_H0 = (
+    0x6a09e667, 0xbb67ae85, 0x3c6ef372, 0xa54ff53a,
+    0x510e527f, 0x9b05688c, 0x1f83d9ab, 0x5be0cd19,
+)
+
+# Groups smaller than this are cheaper through the scalar engine.
+BATCH_MIN = 8
+
+def _padded(message: bytes) -> bytes:
+    whole = len(message) & ~63
+    return bytes(message[:whole]) + padTail(message[whole:], len(message))
+
+def _hashGroup(padded: List[bytes]) -> List[bytes]:
+    """Digests of equally long padded messages, one column of lanes per message."""
+    count, blocks = len(padded), len(padded[0]) // 64
+    words = np.frombuffer(b"".join(padded), dtype=">u4").astype(np.uint32).reshape(count, blocks, 16)
+    K = [np.uint32(k) for k in _K]
+    state = [np.full(count, h, dtype=np.uint32) for h in _H0]
+    w = [None] * 64
+    for j in range(blocks):
+        block = np.ascontiguousarray(words[:, j, :].T)  # (16, count): one row per word
+        for t in range(16):
+            w[t] = block[t]
+        for t in range(16, 64):
+            x = w[t - 15]
+            y = w[t - 2]
+            w[t] = (w[t - 16] + w[t - 7]
+                    + (((x >> 7) | (x << 25)) ^ ((x >> 18) | (x << 14)) ^ (x >> 3))
+                    + (((y >> 17) | (y << 15)) ^ ((y >> 19) | (y << 13)) ^ (y >> 10)))
+        a, b, c, d, e, f, g, h = state
+        for t in range(64):
+            T1 = h + (((e >> 6) | (e << 26)) ^ ((e >> 11) | (e << 21)) ^ ((e >> 25) | (e << 7))) \
+                + (g ^ (e & (f ^ g))) + K[t] + w[t]
+            T2 = (((a >> 2) | (a << 30)) ^ ((a >> 13) | (a << 19)) ^ ((a >> 22) | (a << 10))) \
+                + ((a & b) | (c & (a | b)))
+            h, g, f, e, d, c, b, a = g, f, e, d + T1, c, b, a, T1 + T2
+        state = [s + v for s, v in zip(state, (a, b, c, d, e, f, g, h))]
+    digests = np.stack(state, axis=1).astype(">u4").tobytes()
+    return [digests[i:i + 32] for i in range(0, len(digests), 32)]
+
+def hashMany(messages: Iterable[bytes], scalar: Callable[[bytes], bytes]) -> List[bytes]:
+    """SHA-256 digests of many messages, in input order.
+
+    `scalar` hashes a single message (Sha256.hash); it is used when NumPy is
+    missing and for groups too small to be worth vectorizing.
+    """
+    messages = [bytes(m) for m in messages]
+    if np is None or len(messages) < BATCH_MIN:
+        return [scalar(m) for m in messages]
+
+    groups = {}
+    for i, m in enumerate(messages):
+        groups.setdefault((len(m) + 8) // 64 + 1, []).append(i)
+    out: List[bytes] = [b""] * len(messages)
+    for indices in groups.values():
+        if len(indices) < BATCH_MIN:
+            for i in indices:
+                out[i] = scalar(messages[i])
+            continue
+        for i, digest in zip(indices, _hashGroup([_padded(messages[i]) for i in indices])):
+            out[i] = digest
+    return out
@@ -1,8 +1,12 @@
 import argparse
 import sys
 import os
+import glob
 import base64
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterable, Iterator, List, Optional, Tuple
 from . import Sha256
+from .tree import DEFAULT_LEAF_SIZE, MerkleTree, treeHashFile, changedLeaves, leavesForRanges, rehashLeaves
 
 def hash_string(data: str, raw: bool = False) -> str:
     """Compute SHA-256 hash for a string."""
@@ -27,16 +31,244 @@ def write_output(output_path: str, content: str):
         print(f"Failed to write output file: {e}", file=sys.stderr)
         sys.exit(1)
 
+def expand_paths(patterns: Iterable[str]) -> Tuple[List[str], List[str]]:
+    """Expand files, directories (recursively) and glob patterns into file paths.
+    Returns (files, patterns that matched nothing)."""
+    files, missing = [], []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        found = False
+        for path in matches:
+            if os.path.isdir(path):
+                found = True
+                for root, dirs, names in os.walk(path):
+                    dirs.sort()
+                    files.extend(os.path.join(root, name) for name in sorted(names))
+            elif os.path.isfile(path):
+                files.append(path)
+                found = True
+        if not found:
+            missing.append(pattern)
+    # overlapping patterns (a directory and a glob inside it) list each file once
+    return list(dict.fromkeys(files)), missing
+
+def _hash_one(path: str, chunk_size: int) -> Tuple[str, Optional[bytes], Optional[str]]:
+    try:
+        return path, Sha256.hashFile(path, chunk_size), None
+    except OSError as e:
+        return path, None, e.strerror or str(e)
+
+def hash_files(paths: List[str], jobs: int = 1, chunk_size: int = 65536, tree_leaf: Optional[int] = None
+               ) -> Iterator[Tuple[str, Optional[bytes], Optional[str]]]:
+    """Hash files across `jobs` processes, yielding (path, digest, error) as each finishes.
+    With `tree_leaf`, files are tree-hashed one by one, each across `jobs` processes."""
+    if tree_leaf:
+        for path in paths:
+            try:
+                yield path, treeHashFile(path, tree_leaf, jobs).digest, None
+            except OSError as e:
+                yield path, None, e.strerror or str(e)
+        return
+    if jobs <= 1 or len(paths) <= 1:
+        for path in paths:
+            yield _hash_one(path, chunk_size)
+        return
+    with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as pool:
+        futures = [pool.submit(_hash_one, path, chunk_size) for path in paths]
+        for future in as_completed(futures):
+            yield future.result()
+
+def _escape_name(path: str) -> Tuple[str, str]:
+    # sha256sum escapes backslashes and newlines in names and marks such lines with a leading '\'
+    if "\\" in path or "\n" in path:
+        return "\\", path.replace("\\", "\\\\").replace("\n", "\\n")
+    return "", path
+
+def _unescape_name(name: str) -> str:
+    out, i = [], 0
+    while i < len(name):
+        if name[i] == "\\" and i + 1 < len(name):
+            out.append("\n" if name[i + 1] == "n" else name[i + 1])
+            i += 2
+        else:
+            out.append(name[i])
+            i += 1
+    return "".join(out)
+
+def format_line(path: str, digest: bytes, raw: bool = False) -> str:
+    """One `sha256sum` output line: '<hex>  <path>'."""
+    prefix, name = _escape_name(path)
+    value = base64.b64encode(digest).decode("utf-8") if raw else digest.hex()
+    return f"{prefix}{value}  {name}"
+
+def parse_manifest(lines: Iterable[str]) -> Tuple[List[Tuple[str, str]], int]:
+    """Parse `sha256sum` lines ('<hex>  <path>' or '<hex> *<path>').
+    Returns ([(path, expected hex)], number of malformed lines)."""
+    entries, bad = [], 0
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if not line.strip() or line.startswith("#"):
+            continue
+        escaped = line.startswith("\\")
+        if escaped:
+            line = line[1:]
+        digest, sep, name = line.partition(" ")
+        if not sep or len(digest) != 64 or not name or name[0] not in " *":
+            bad += 1
+            continue
+        try:
+            bytes.fromhex(digest)
+        except ValueError:
+            bad += 1
+            continue
+        name = name[1:]
+        entries.append((_unescape_name(name) if escaped else name, digest.lower()))
+    return entries, bad
+
+def check_manifest(manifest: str, jobs: int = 1, chunk_size: int = 65536, quiet: bool = False,
+                   tree_leaf: Optional[int] = None) -> bool:
+    """Verify every entry of a `sha256sum` manifest ('-' = stdin); True if all match."""
+    try:
+        if manifest == "-":
+            entries, bad = parse_manifest(sys.stdin)
+        else:
+            with open(manifest, "r", encoding="utf-8") as f:
+                entries, bad = parse_manifest(f)
+    except OSError as e:
+        print(f"{manifest}: {e.strerror or e}", file=sys.stderr)
+        return False
+    if not entries:
+        print(f"{manifest}: no properly formatted SHA256 checksum lines found", file=sys.stderr)
+        return False
+    expected = {}
+    for path, digest in entries:
+        expected.setdefault(path, []).append(digest)
+    failed = unreadable = 0
+    for path, digest, error in hash_files(list(expected), jobs, chunk_size, tree_leaf):
+        for want in expected[path]:
+            if error is not None:
+                unreadable += 1
+                print(f"{path}: FAILED open or read")
+            elif digest.hex() != want:
+                failed += 1
+                print(f"{path}: FAILED")
+            elif not quiet:
+                print(f"{path}: OK")
+            sys.stdout.flush()
+    if bad:
+        print(f"WARNING: {bad} line{'s are' if bad > 1 else ' is'} improperly formatted", file=sys.stderr)
+    if unreadable:
+        print(f"WARNING: {unreadable} listed file{'s' if unreadable > 1 else ''} could not be read", file=sys.stderr)
+    if failed:
+        print(f"WARNING: {failed} computed checksum{'s' if failed > 1 else ''} did NOT match", file=sys.stderr)
+    return not (failed or unreadable)
+
+def hash_many_files(patterns: List[str], jobs: int, chunk_size: int, raw: bool = False,
+                    output: Optional[str] = None, tree_leaf: Optional[int] = None) -> bool:
+    """Hash every file matched by `patterns`, streaming `sha256sum` lines as they complete."""
+    files, missing = expand_paths(patterns)
+    for pattern in missing:
+        print(f"{pattern}: No such file or directory", file=sys.stderr)
+    out = open(output, "w", encoding="utf-8") if output else sys.stdout
+    ok = not missing
+    try:
+        for path, digest, error in hash_files(files, jobs, chunk_size, tree_leaf):
+            if error is not None:
+                print(f"{path}: {error}", file=sys.stderr)
+                ok = False
+                continue
+            out.write(format_line(path, digest, raw) + "\n")
+            out.flush()
+    finally:
+        if output:
+            out.close()
+    if output:
+        print(f"Result has been saved to: {output}")
+    return ok
+
+def parse_range(text: str) -> Tuple[int, int]:
+    """'OFFSET:LENGTH' -> (offset, length)."""
+    offset, sep, length = text.partition(":")
+    try:
+        if not sep:
+            raise ValueError
+        return int(offset, 0), int(length, 0)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected OFFSET:LENGTH, got {text!r}")
+
+def tree_state_command(path: str, state: str, leaf_size: int, jobs: int, verify: bool,
+                       ranges: List[Tuple[int, int]]) -> bool:
+    """--tree with a leaf state file: create it, verify against it, or re-hash only changed leaves."""
+    if not os.path.isfile(path):
+        print(f"File not found: {path}", file=sys.stderr)
+        return False
+    if not verify and not ranges:
+        tree = treeHashFile(path, leaf_size, jobs)
+        tree.save(state)
+        print(format_line(path, tree.digest))
+        return True
+    try:
+        tree = MerkleTree.load(state)
+    except (OSError, ValueError) as e:
+        print(f"{state}: {e}", file=sys.stderr)
+        return False
+    if verify:
+        changed = changedLeaves(path, tree, jobs)
+        for i in changed:
+            start, end = tree.leafRange(i)
+            print(f"{path}: leaf {i} [{start}, {max(end, start + 1)}) CHANGED")
+        print(f"{path}: {'OK' if not changed else f'{len(changed)} of {len(tree.leaves)} leaves changed'}")
+        return not changed
+    tree = rehashLeaves(path, tree, leavesForRanges(ranges, tree.leafSize), jobs)
+    tree.save(state)
+    print(format_line(path, tree.digest))
+    return True
+
 def main():
     parser = argparse.ArgumentParser(
         prog="sha256cli",
         description="A simple SHA-256 command-line tool (pure Python, no hashlib)."
     )
-    parser.add_argument("input", nargs="?", help="String or file path to hash.")
+    parser.add_argument(
+        "inputs", nargs="*", metavar="input",
+        help="String to hash, or with -f: files, directories (recursive) and glob patterns."
+    )
     parser.add_argument(
         "-f", "--file", action="store_true",
         help="Treat input as a file path instead of a plain string."
     )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=os.cpu_count() or 1,
+        help="Number of worker processes for multiple files (default: CPU count)."
+    )
+    parser.add_argument(
+        "--check", metavar="MANIFEST",
+        help="Verify files listed in a sha256sum-format manifest ('-' = stdin)."
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true",
+        help="With --check, do not print OK for each verified file."
+    )
+    parser.add_argument(
+        "--tree", action="store_true",
+        help="Merkle-tree hash: leaves hashed in parallel. NOT the same digest as plain SHA-256 / sha256sum."
+    )
+    parser.add_argument(
+        "--leaf-size", type=int, default=DEFAULT_LEAF_SIZE,
+        help=f"Leaf size in bytes for --tree (default: {DEFAULT_LEAF_SIZE})."
+    )
+    parser.add_argument(
+        "--tree-state", metavar="STATE",
+        help="With --tree and one file: save its leaf hashes to STATE (or use them with --tree-verify/--tree-changed)."
+    )
+    parser.add_argument(
+        "--tree-verify", action="store_true",
+        help="Re-hash the file and list the leaves that differ from --tree-state."
+    )
+    parser.add_argument(
+        "--tree-changed", metavar="OFFSET:LENGTH", type=parse_range, action="append", default=[],
+        help="Re-hash only the leaves touching this byte range and update --tree-state (repeatable)."
+    )
     parser.add_argument(
         "-r", "--raw", action="store_true",
         help="Output in Base64 format instead of hexadecimal."
@@ -52,11 +284,44 @@ def main():
 
     args = parser.parse_args()
 
-    if not args.input:
+    if args.jobs < 1:
+        parser.error("--jobs must be >= 1")
+    if args.leaf_size < 1:
+        parser.error("--leaf-size must be >= 1")
+    if (args.tree_state or args.tree_verify or args.tree_changed) and not args.tree:
+        parser.error("--tree-state, --tree-verify and --tree-changed require --tree")
+    if (args.tree_verify or args.tree_changed) and not args.tree_state:
+        parser.error("--tree-verify and --tree-changed require --tree-state")
+    tree_leaf = args.leaf_size if args.tree else None
+
+    if args.check:
+        sys.exit(0 if check_manifest(args.check, args.jobs, args.chunk, args.quiet, tree_leaf) else 1)
+
+    if not args.inputs:
         print("Please provide a string or file path to hash.", file=sys.stderr)
         parser.print_help()
         sys.exit(1)
 
+    if args.tree_state:
+        if len(args.inputs) != 1:
+            parser.error("--tree-state takes exactly one file")
+        ok = tree_state_command(args.inputs[0], args.tree_state, args.leaf_size, args.jobs,
+                                args.tree_verify, args.tree_changed)
+        sys.exit(0 if ok else 1)
+
+    # tree digests are always listed with their path, so they are not mistaken for plain SHA-256
+    if args.tree:
+        ok = hash_many_files(args.inputs, args.jobs, args.chunk, args.raw, args.output, tree_leaf)
+        sys.exit(0 if ok else 1)
+
+    # several paths, a directory or a glob: sha256sum-style listing, hashed in parallel
+    if args.file and (len(args.inputs) > 1 or not os.path.isfile(args.inputs[0])):
+        ok = hash_many_files(args.inputs, args.jobs, args.chunk, args.raw, args.output)
+        sys.exit(0 if ok else 1)
+    if len(args.inputs) > 1:
+        parser.error("multiple inputs require -f/--file")
+    args.input = args.inputs[0]
+
     # Compute hash
     result = (
         hash_file(args.input, raw=args.raw, chunk_size=args.chunk)
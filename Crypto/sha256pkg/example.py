@@ -1,4 +1,5 @@
 from . import Sha256
+from .sha256_algo import ENGINE, ENGINES, checkEngine
 from .utils import intToHex, hexToInt
 
 def main():
@@ -12,6 +13,11 @@ def main():
         got = Sha256.hashHex(msg)
         print(f"{msg!r} -> {got} | {'OK' if got == expect else 'FAIL'}")
 
+    # every compression engine must agree with the test vectors
+    print(f"Engine in use: {ENGINE}")
+    for name, compress in ENGINES.items():
+        print(f"engine {name!r} parity: {'OK' if checkEngine(compress) else 'FAIL'}")
+
     # int <-> hex helpers
     n = 305419896  # 0x12345678
     hx = intToHex(n, width=8, spaced=True)
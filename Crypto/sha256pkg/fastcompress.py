@@ -0,0 +1,80 @@
+"""Fast SHA-256 compression function.
+
+Same result as the readable `_compressReference` in sha256_algo.py, but with
+every bit operation from bitops.py inlined into local-variable arithmetic:
+- rotations are written as (x >> n) | (x << (32 - n)) and masked once per sum,
+- Ch and Maj use their 3-operation forms,
+- the schedule is extended in place on one preallocated list and stores
+  K[t] + W[t], so each round needs a single table lookup,
+- rounds are unrolled 8 at a time, renaming a..h instead of shifting them.
+"""
+from struct import Struct
+
+_BLOCK = Struct(">16I")
+
+_K = (
+    0x428a2f98, 0x71374491, 0xb5c0fbcf, 0xe9b5dba5, 0x3956c25b, 0x59f111f1, 0x923f82a4, 0xab1c5ed5,
+    0xd807aa98, 0x12835b01, 0x243185be, 0x550c7dc3, 0x72be5d74, 0x80deb1fe, 0x9bdc06a7, 0xc19bf174,
+    0xe49b69c1, 0xefbe4786, 0x0fc19dc6, 0x240ca1cc, 0x2de92c6f, 0x4a7484aa, 0x5cb0a9dc, 0x76f988da,
+    0x983e5152, 0xa831c66d, 0xb00327c8, 0xbf597fc7, 0xc6e00bf3, 0xd5a79147, 0x06ca6351, 0x14292967,
+    0x27b70a85, 0x2e1b2138, 0x4d2c6dfc, 0x53380d13, 0x650a7354, 0x766a0abb, 0x81c2c92e, 0x92722c85,
+    0xa2bfe8a1, 0xa81a664b, 0xc24b8b70, 0xc76c51a3, 0xd192e819, 0xd6990624, 0xf40e3585, 0x106aa070,
+    0x19a4c116, 0x1e376c08, 0x2748774c, 0x34b0bcb5, 0x391c0cb3, 0x4ed8aa4a, 0x5b9cca4f, 0x682e6ff3,
+    0x748f82ee, 0x78a5636f, 0x84c87814, 0x8cc70208, 0x90befffa, 0xa4506ceb, 0xbef9a3f7, 0xc67178f2,
+)
+
+def compressFast(state: list[int], block) -> None:
+    """Compress one 64-byte block (any bytes-like object) into the 8-word `state`, in place."""
+    w = [0] * 64
+    w[:16] = _BLOCK.unpack(block)
+    for t in range(16, 64):
+        x = w[t - 15]
+        y = w[t - 2]
+        w[t] = (w[t - 16] + w[t - 7]
+                + (((x >> 7) | (x << 25)) ^ ((x >> 18) | (x << 14)) ^ (x >> 3))
+                + (((y >> 17) | (y << 15)) ^ ((y >> 19) | (y << 13)) ^ (y >> 10))) & 0xFFFFFFFF
+    for t, k in enumerate(_K):
+        w[t] += k
+
+    a, b, c, d, e, f, g, h = state
+    for t in range(0, 64, 8):
+        h = h + (((e >> 6) | (e << 26)) ^ ((e >> 11) | (e << 21)) ^ ((e >> 25) | (e << 7))) + (g ^ (e & (f ^ g))) + w[t]
+        d = (d + h) & 0xFFFFFFFF
+        h = (h + (((a >> 2) | (a << 30)) ^ ((a >> 13) | (a << 19)) ^ ((a >> 22) | (a << 10))) + ((a & b) | (c & (a | b)))) & 0xFFFFFFFF
+
+        g = g + (((d >> 6) | (d << 26)) ^ ((d >> 11) | (d << 21)) ^ ((d >> 25) | (d << 7))) + (f ^ (d & (e ^ f))) + w[t + 1]
+        c = (c + g) & 0xFFFFFFFF
+        g = (g + (((h >> 2) | (h << 30)) ^ ((h >> 13) | (h << 19)) ^ ((h >> 22) | (h << 10))) + ((h & a) | (b & (h | a)))) & 0xFFFFFFFF
+
+        f = f + (((c >> 6) | (c << 26)) ^ ((c >> 11) | (c << 21)) ^ ((c >> 25) | (c << 7))) + (e ^ (c & (d ^ e))) + w[t + 2]
+        b = (b + f) & 0xFFFFFFFF
+        f = (f + (((g >> 2) | (g << 30)) ^ ((g >> 13) | (g << 19)) ^ ((g >> 22) | (g << 10))) + ((g & h) | (a & (g | h)))) & 0xFFFFFFFF
+
+        e = e + (((b >> 6) | (b << 26)) ^ ((b >> 11) | (b << 21)) ^ ((b >> 25) | (b << 7))) + (d ^ (b & (c ^ d))) + w[t + 3]
+        a = (a + e) & 0xFFFFFFFF
+        e = (e + (((f >> 2) | (f << 30)) ^ ((f >> 13) | (f << 19)) ^ ((f >> 22) | (f << 10))) + ((f & g) | (h & (f | g)))) & 0xFFFFFFFF
+
+        d = d + (((a >> 6) | (a << 26)) ^ ((a >> 11) | (a << 21)) ^ ((a >> 25) | (a << 7))) + (c ^ (a & (b ^ c))) + w[t + 4]
+        h = (h + d) & 0xFFFFFFFF
+        d = (d + (((e >> 2) | (e << 30)) ^ ((e >> 13) | (e << 19)) ^ ((e >> 22) | (e << 10))) + ((e & f) | (g & (e | f)))) & 0xFFFFFFFF
+
+        c = c + (((h >> 6) | (h << 26)) ^ ((h >> 11) | (h << 21)) ^ ((h >> 25) | (h << 7))) + (b ^ (h & (a ^ b))) + w[t + 5]
+        g = (g + c) & 0xFFFFFFFF
+        c = (c + (((d >> 2) | (d << 30)) ^ ((d >> 13) | (d << 19)) ^ ((d >> 22) | (d << 10))) + ((d & e) | (f & (d | e)))) & 0xFFFFFFFF
+
+        b = b + (((g >> 6) | (g << 26)) ^ ((g >> 11) | (g << 21)) ^ ((g >> 25) | (g << 7))) + (a ^ (g & (h ^ a))) + w[t + 6]
+        f = (f + b) & 0xFFFFFFFF
+        b = (b + (((c >> 2) | (c << 30)) ^ ((c >> 13) | (c << 19)) ^ ((c >> 22) | (c << 10))) + ((c & d) | (e & (c | d)))) & 0xFFFFFFFF
+
+        a = a + (((f >> 6) | (f << 26)) ^ ((f >> 11) | (f << 21)) ^ ((f >> 25) | (f << 7))) + (h ^ (f & (g ^ h))) + w[t + 7]
+        e = (e + a) & 0xFFFFFFFF
+        a = (a + (((b >> 2) | (b << 30)) ^ ((b >> 13) | (b << 19)) ^ ((b >> 22) | (b << 10))) + ((b & c) | (d & (b | c)))) & 0xFFFFFFFF
+
+    state[0] = (state[0] + a) & 0xFFFFFFFF
+    state[1] = (state[1] + b) & 0xFFFFFFFF
+    state[2] = (state[2] + c) & 0xFFFFFFFF
+    state[3] = (state[3] + d) & 0xFFFFFFFF
+    state[4] = (state[4] + e) & 0xFFFFFFFF
+    state[5] = (state[5] + f) & 0xFFFFFFFF
+    state[6] = (state[6] + g) & 0xFFFFFFFF
+    state[7] = (state[7] + h) & 0xFFFFFFFF
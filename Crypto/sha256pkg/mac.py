@@ -0,0 +1,84 @@
+"""HMAC-SHA256 (RFC 2104) and HKDF-SHA256 (RFC 5869) on top of Sha256.
+
+The keyed states Sha256(K ^ ipad) and Sha256(K ^ opad) are one compressed
+block each; they are computed once per key and reused, so a MAC costs only
+the message blocks plus the two final compressions.
+"""
+from secrets import compare_digest
+from Crypto.fastbytes import xorConst
+from .sha256_algo import Sha256
+
+BLOCK_SIZE = 64
+DIGEST_SIZE = 32
+
+class HmacSha256:
+    """HMAC-SHA256 with hashlib/hmac-like update()/digest().
+
+    Keep one instance per key: mac()/verify() are one-shot and never touch the
+    precomputed pad states, update() streams into a running copy of them.
+    """
+    def __init__(self, key: bytes | bytearray | memoryview, data: bytes | bytearray | memoryview | None = None):
+        key = bytes(key)
+        if len(key) > BLOCK_SIZE:
+            key = Sha256.hash(key)
+        key = key.ljust(BLOCK_SIZE, b"\x00")
+        self._innerKeyed = Sha256(xorConst(key, 0x36))
+        self._outerKeyed = Sha256(xorConst(key, 0x5C))
+        self._inner = self._innerKeyed.copy()
+        if data:
+            self.update(data)
+
+    def mac(self, message: bytes | bytearray | memoryview) -> bytes:
+        """HMAC of one whole message, reusing the precomputed pad states."""
+        return self._outerKeyed.digestWith(self._innerKeyed.digestWith(message))
+
+    def verify(self, message: bytes | bytearray | memoryview, tag: bytes) -> bool:
+        """Constant-time comparison of `tag` with the HMAC of `message`."""
+        return compare_digest(self.mac(message), bytes(tag))
+
+    def update(self, data: bytes | bytearray | memoryview) -> None:
+        self._inner.update(data)
+
+    def copy(self) -> "HmacSha256":
+        other = HmacSha256.__new__(HmacSha256)
+        other._innerKeyed = self._innerKeyed
+        other._outerKeyed = self._outerKeyed
+        other._inner = self._inner.copy()
+        return other
+
+    def reset(self) -> None:
+        """Start a new message with the same key."""
+        self._inner = self._innerKeyed.copy()
+
+    def digest(self) -> bytes:
+        return self._outerKeyed.digestWith(self._inner.digest())
+
+    def hexdigest(self) -> str:
+        return self.digest().hex()
+
+def hmacSha256(key: bytes, message: bytes) -> bytes:
+    """One-shot HMAC-SHA256; for many messages under one key keep an HmacSha256."""
+    return HmacSha256(key).mac(message)
+
+# ---------------- HKDF (RFC 5869) ----------------
+def hkdfExtract(salt: bytes | None, ikm: bytes) -> bytes:
+    """PRK = HMAC(salt, IKM); an empty/None salt means 32 zero bytes."""
+    return HmacSha256(salt or b"\x00" * DIGEST_SIZE).mac(ikm)
+
+def hkdfExpand(prk: bytes, info: bytes = b"", length: int = DIGEST_SIZE) -> bytes:
+    """OKM = T(1) || T(2) || ... truncated to `length` bytes (at most 255 * 32)."""
+    if length < 0 or length > 255 * DIGEST_SIZE:
+        raise ValueError("HKDF output length must be between 0 and 8160 bytes")
+    mac = HmacSha256(prk)  # pad states computed once for every T(i)
+    okm = bytearray()
+    block = b""
+    counter = 1
+    while len(okm) < length:
+        block = mac.mac(block + info + bytes([counter]))
+        okm += block
+        counter += 1
+    return bytes(okm[:length])
+
+def hkdf(ikm: bytes, length: int = DIGEST_SIZE, salt: bytes | None = None, info: bytes = b"") -> bytes:
+    """HKDF-SHA256: derive `length` bytes of key material from `ikm`."""
+    return hkdfExpand(hkdfExtract(salt, ikm), info, length)
@@ -9,6 +9,14 @@ def pad(message: bytes) -> bytes:
     data += ml.to_bytes(8, byteorder="big")
     return bytes(data)
 
+def padTail(tail: bytes, totalLength: int) -> bytes:
+    """Pad the final (< 64 byte) remainder of a message whose full length is totalLength bytes."""
+    data = bytearray(tail)
+    data.append(0x80)
+    data += b"\x00" * ((55 - len(tail)) % 64)
+    data += (totalLength * 8).to_bytes(8, byteorder="big")
+    return bytes(data)
+
 def messageSchedule(block: bytes) -> list[int]:
     # first 16 words (big-endian)
     w = [int.from_bytes(block[i:i+4], "big") for i in range(0, 64, 4)]
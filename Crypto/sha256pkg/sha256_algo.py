@@ -1,5 +1,11 @@
+import mmap
+import os
+import struct
+from typing import Iterable
 from .bitops import ch, maj, bigSigma0, bigSigma1
-from .padding import pad, messageSchedule
+from .padding import padTail, messageSchedule
+from .fastcompress import compressFast
+from .batch import hashMany as _hashMany
 
 _H0 = [
     0x6a09e667, 0xbb67ae85, 0x3c6ef372, 0xa54ff53a,
@@ -17,6 +23,117 @@ _K = [
     0x748f82ee, 0x78a5636f, 0x84c87814, 0x8cc70208, 0x90befffa, 0xa4506ceb, 0xbef9a3f7, 0xc67178f2,
 ]
 
+def _compressReference(state: list[int], chunk: bytes) -> None:
+    """Readable compression function, one FIPS 180-4 step per line."""
+    W = messageSchedule(chunk)
+    a, b, c, d, e, f, g, h = state
+
+    for t in range(64):
+        T1 = (h + bigSigma1(e) + ch(e, f, g) + _K[t] + W[t]) & 0xFFFFFFFF
+        T2 = (bigSigma0(a) + maj(a, b, c)) & 0xFFFFFFFF
+        h = g
+        g = f
+        f = e
+        e = (d + T1) & 0xFFFFFFFF
+        d = c
+        c = b
+        b = a
+        a = (T1 + T2) & 0xFFFFFFFF
+
+    state[0] = (state[0] + a) & 0xFFFFFFFF
+    state[1] = (state[1] + b) & 0xFFFFFFFF
+    state[2] = (state[2] + c) & 0xFFFFFFFF
+    state[3] = (state[3] + d) & 0xFFFFFFFF
+    state[4] = (state[4] + e) & 0xFFFFFFFF
+    state[5] = (state[5] + f) & 0xFFFFFFFF
+    state[6] = (state[6] + g) & 0xFFFFFFFF
+    state[7] = (state[7] + h) & 0xFFFFFFFF
+
+# compression engines: "fast" (fastcompress.py, default) or "reference" (above).
+# Chosen once at import time via the SHA256_ENGINE environment variable.
+ENGINES = {
+    "fast": compressFast,
+    "reference": _compressReference,
+}
+
+# FIPS 180-4 / NIST CSRC examples: one block, two blocks, and a long message
+_TEST_VECTORS = [
+    (b"", "e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855"),
+    (b"abc", "ba7816bf8f01cfea414140de5dae2223b00361a396177a9cb410ff61f20015ad"),
+    (b"abcdbcdecdefdefgefghfghighijhijkijkljklmklmnlmnomnopnopq",
+     "248d6a61d20638b8e5c026930c3e6039a33ce45964ff2167f6ecedd419db06c1"),
+    (b"a" * 1000, "41edece42d63e8d9bf515a9ba6932e1c20cbc9f5a5d134645adb5db1b9737ea3"),
+]
+
+def checkEngine(compress) -> bool:
+    """Run a compression function over the known test vectors; True if every digest matches."""
+    for message, expected in _TEST_VECTORS:
+        state = _H0.copy()
+        padded = padTail(message[len(message) & ~63:], len(message))
+        for block in (message[i:i + 64] for i in range(0, len(message) & ~63, 64)):
+            compress(state, block)
+        for i in range(0, len(padded), 64):
+            compress(state, padded[i:i + 64])
+        if b"".join(w.to_bytes(4, "big") for w in state).hex() != expected:
+            return False
+    return True
+
+def _selectEngine(name: str):
+    if name not in ENGINES:
+        raise ValueError(f"Unknown SHA-256 engine {name!r}; choose from {sorted(ENGINES)}")
+    compress = ENGINES[name]
+    # never let an optimized engine silently produce wrong digests
+    if compress is not _compressReference and not checkEngine(compress):
+        return "reference", _compressReference
+    return name, compress
+
+ENGINE, _compress = _selectEngine(os.environ.get("SHA256_ENGINE", "fast").strip().lower())
+
+# exported state: magic, bytes absorbed, H0..H7, then the (< 64 byte) unprocessed tail
+_STATE = struct.Struct(">4sQ8I")
+_STATE_MAGIC = b"S256"
+
+DEFAULT_CHECKPOINT_EVERY = 64 << 20  # 64 MiB
+
+# checkpoint file: magic, st_dev, st_ino, length of the block that follows, the
+# last full block before the buffered tail, then the exported state
+_CHECKPOINT = struct.Struct(">4sQQB")
+_CHECKPOINT_MAGIC = b"SCK1"
+
+def _loadCheckpoint(checkpointPath: str, f, size: int) -> "Sha256 | None":
+    """State saved by an earlier hashFile run, if it still matches the open file."""
+    try:
+        with open(checkpointPath, "rb") as cp:
+            data = cp.read()
+        magic, dev, ino, blockLen = _CHECKPOINT.unpack_from(data)
+        block = data[_CHECKPOINT.size:_CHECKPOINT.size + blockLen]
+        h = Sha256.fromState(data[_CHECKPOINT.size + blockLen:])
+    except (OSError, ValueError, struct.error):
+        return None
+    st = os.fstat(f.fileno())
+    if magic != _CHECKPOINT_MAGIC or (dev, ino) != (st.st_dev, st.st_ino) or len(block) != blockLen:
+        return None  # another file, or replaced since the checkpoint
+    if h._counter > size:
+        return None  # truncated since the checkpoint
+    # the last full block and the buffered tail must still be in the file at the same place
+    f.seek(h._counter - len(h._buffer) - blockLen)
+    if f.read(blockLen + len(h._buffer)) != block + h._buffer:
+        return None
+    return h
+
+def _saveCheckpoint(checkpointPath: str, h: "Sha256", f) -> None:
+    st = os.fstat(f.fileno())
+    covered = h._counter - len(h._buffer)
+    blockLen = min(64, covered)
+    pos = f.tell()
+    f.seek(covered - blockLen)
+    block = f.read(blockLen)
+    f.seek(pos)
+    tmp = checkpointPath + ".tmp"
+    with open(tmp, "wb") as cp:
+        cp.write(_CHECKPOINT.pack(_CHECKPOINT_MAGIC, st.st_dev, st.st_ino, blockLen) + block + h.exportState())
+    os.replace(tmp, checkpointPath)  # never leave a half-written checkpoint
+
 class Sha256:
     """A small, pure-Python SHA-256 implementation with hashlib-like API."""
     def __init__(self, data: bytes | bytearray | memoryview | None = None):
@@ -30,6 +147,12 @@ class Sha256:
     def hash(data: bytes | bytearray | memoryview) -> bytes:
         return Sha256(data).digest()
 
+    @staticmethod
+    def hashMany(messages: Iterable[bytes | bytearray | memoryview]) -> list[bytes]:
+        """Digests of many messages at once; same as [Sha256.hash(m) for m in messages].
+        With NumPy, messages of the same padded length are hashed in lockstep."""
+        return _hashMany(messages, Sha256.hash)
+
     @staticmethod
     def hashHex(data: str | bytes | bytearray | memoryview) -> str:
         if isinstance(data, str):
@@ -37,27 +160,89 @@ class Sha256:
         return Sha256(data).hexdigest()
 
     @staticmethod
-    def hashFile(path: str, chunkSize: int = 65536) -> bytes:
+    def hashFile(path: str, chunkSize: int = 65536, useMmap: bool = True,
+                 checkpointPath: str | None = None, checkpointEvery: int = DEFAULT_CHECKPOINT_EVERY) -> bytes:
         """
-        Tính SHA-256 cho file theo block (chunk) mà không cần tải hết file vào RAM.
-        Trả về kết quả dạng bytes (32 byte).
+        SHA-256 of a file, block by block, without loading it all into RAM.
+        Regular files are memory-mapped and fed to the compression function
+        64 bytes at a time through a memoryview, without intermediate copies;
+        other files (pipes, devices) or useMmap=False fall back to chunked reads.
+
+        With checkpointPath, the state is saved there every checkpointEvery bytes
+        and at the end, and a later call resumes from it: an interrupted run, or
+        an append-only file that has grown, only needs the bytes after it. The
+        checkpoint is dropped (full re-hash) if the file is now shorter, is a
+        different file (device/inode), or the last full block and buffered bytes
+        before the resume point differ; other in-place edits are not detected.
+        Returns the 32-byte digest.
         """
-        h = Sha256()
         with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            h = None
+            if checkpointPath is not None:
+                h = _loadCheckpoint(checkpointPath, f, size)
+            if h is None:
+                h = Sha256()
+            start = h._counter
+            step = max(64, checkpointEvery - checkpointEvery % 64) if checkpointPath else size or 1
+
+            if useMmap and size > start:
+                try:
+                    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except (OSError, ValueError):
+                    mm = None
+                if mm is not None:
+                    with mm, memoryview(mm) as view:
+                        for pos in range(start, size, step):
+                            h.update(view[pos:pos + step])
+                            if checkpointPath is not None:
+                                _saveCheckpoint(checkpointPath, h, f)
+                    return h.digest()
+
+            f.seek(start)
+            sinceCheckpoint = 0
             while True:
                 chunk = f.read(chunkSize)
                 if not chunk:
                     break
                 h.update(chunk)
+                sinceCheckpoint += len(chunk)
+                if checkpointPath is not None and sinceCheckpoint >= step:
+                    _saveCheckpoint(checkpointPath, h, f)
+                    sinceCheckpoint = 0
+            if checkpointPath is not None and (sinceCheckpoint or start == 0):
+                _saveCheckpoint(checkpointPath, h, f)
         return h.digest()
 
     @staticmethod
-    def hashFileHex(path: str, chunkSize: int = 65536) -> str:
+    def hashFileHex(path: str, chunkSize: int = 65536, useMmap: bool = True,
+                    checkpointPath: str | None = None, checkpointEvery: int = DEFAULT_CHECKPOINT_EVERY) -> str:
         """Trả về kết quả băm file dạng hex string (lowercase)."""
-        return Sha256.hashFile(path, chunkSize).hex()
+        return Sha256.hashFile(path, chunkSize, useMmap, checkpointPath, checkpointEvery).hex()
+
+    def exportState(self) -> bytes:
+        """Compact serialized state (44-107 bytes); restore with Sha256.fromState."""
+        return _STATE.pack(_STATE_MAGIC, self._counter, *self._h) + bytes(self._buffer)
+
+    @staticmethod
+    def fromState(state: bytes | bytearray | memoryview) -> "Sha256":
+        """Rebuild a Sha256 from exportState() output; further update() calls continue the hash."""
+        state = bytes(state)
+        if len(state) < _STATE.size or len(state) - _STATE.size >= 64:
+            raise ValueError("Invalid SHA-256 state length")
+        magic, counter, *words = _STATE.unpack_from(state)
+        tail = state[_STATE.size:]
+        if magic != _STATE_MAGIC or counter % 64 != len(tail):
+            raise ValueError("Invalid SHA-256 state")
+        h = Sha256.__new__(Sha256)
+        h._buffer = bytearray(tail)
+        h._counter = counter
+        h._h = list(words)
+        return h
 
     def copy(self) -> "Sha256":
-        other = Sha256()
+        """Snapshot of the current (mid)state; absorb a common prefix once, then copy per suffix."""
+        other = Sha256.__new__(Sha256)
         other._buffer = bytearray(self._buffer)
         other._counter = self._counter
         other._h = self._h.copy()
@@ -66,52 +251,50 @@ class Sha256:
     def update(self, data: bytes | bytearray | memoryview) -> None:
         if not data:
             return
-        data = bytes(data)
-        self._buffer.extend(data)
-        self._counter += len(data)
+        view = memoryview(data).cast("B")
+        n = len(view)
+        self._counter += n
+        pos = 0
+
+        # top up a partial block left over from the previous call
+        if self._buffer:
+            pos = min(64 - len(self._buffer), n)
+            self._buffer += view[:pos]
+            if len(self._buffer) < 64:
+                return
+            _compress(self._h, self._buffer)
+            self._buffer.clear()
+
+        # whole blocks straight from the caller's buffer (memoryview slices are zero-copy)
+        end = pos + ((n - pos) & ~63)
+        compress, state = _compress, self._h
+        for i in range(pos, end, 64):
+            compress(state, view[i:i + 64])
 
-        # process in 64-byte chunks
-        chunk_size = 64
-        while len(self._buffer) >= chunk_size:
-            self._compress(self._buffer[:chunk_size])
-            del self._buffer[:chunk_size]
+        # only the sub-64-byte remainder is buffered
+        if end < n:
+            self._buffer += view[end:]
 
     def _compress(self, chunk: bytes) -> None:
-        W = messageSchedule(chunk)
-        a, b, c, d, e, f, g, h = self._h
-
-        for t in range(64):
-            T1 = (h + bigSigma1(e) + ch(e, f, g) + _K[t] + W[t]) & 0xFFFFFFFF
-            T2 = (bigSigma0(a) + maj(a, b, c)) & 0xFFFFFFFF
-            h = g
-            g = f
-            f = e
-            e = (d + T1) & 0xFFFFFFFF
-            d = c
-            c = b
-            b = a
-            a = (T1 + T2) & 0xFFFFFFFF
-
-        self._h[0] = (self._h[0] + a) & 0xFFFFFFFF
-        self._h[1] = (self._h[1] + b) & 0xFFFFFFFF
-        self._h[2] = (self._h[2] + c) & 0xFFFFFFFF
-        self._h[3] = (self._h[3] + d) & 0xFFFFFFFF
-        self._h[4] = (self._h[4] + e) & 0xFFFFFFFF
-        self._h[5] = (self._h[5] + f) & 0xFFFFFFFF
-        self._h[6] = (self._h[6] + g) & 0xFFFFFFFF
-        self._h[7] = (self._h[7] + h) & 0xFFFFFFFF
+        _compress(self._h, chunk)
 
     def digest(self) -> bytes:
-        # finalize with padding (without mutating self)
-        h = self.copy()
-        final_data = pad(bytes(h._buffer))
-        # prepend any full chunks worth of data (none left in buffer by update)
-        if final_data:
-            # need to include original length; pad() includes length already,
-            # so just process the padded buffer in 64-byte chunks.
-            for i in range(0, len(final_data), 64):
-                h._compress(final_data[i:i+64])
-        return b"".join(word.to_bytes(4, "big") for word in h._h)
+        return self.digestWith(b"")
+
+    def digestWith(self, suffix: bytes | bytearray | memoryview) -> bytes:
+        """Digest of everything absorbed so far followed by `suffix`, without mutating self.
+
+        The prefix is never re-hashed, so one Sha256(prefix) serves many suffixes
+        (e.g. MGF1 counters) at the cost of only the suffix and padding blocks.
+        """
+        # the length field is the total message length, not just what is left in the buffer
+        tail = bytes(self._buffer) + bytes(suffix)
+        state = self._h.copy()
+        whole = len(tail) & ~63
+        final_data = tail[:whole] + padTail(tail[whole:], self._counter + len(suffix))
+        for i in range(0, len(final_data), 64):
+            _compress(state, final_data[i:i + 64])
+        return b"".join(word.to_bytes(4, "big") for word in state)
 
     def hexdigest(self) -> str:
         return self.digest().hex()
@@ -0,0 +1,150 @@
+"""Merkle-tree (chunked, parallel) hashing of large files.
+
+NOTE: the tree digest is NOT the SHA-256 of the file and will never match
+`sha256sum`; it is only comparable with other tree digests computed with the
+same leaf size. In exchange, leaves are independent, so they are hashed in
+parallel across processes, and a file that changed in a few places can be
+re-verified or re-hashed leaf by leaf against a saved leaf state.
+
+    leaf i   = SHA256(0x00 || data[i * leafSize : (i + 1) * leafSize])
+    node     = SHA256(0x01 || left || right)     (an odd last node moves up as is)
+    digest   = SHA256(0x02 || leafSize || fileLength || top node)   (64-bit big-endian)
+
+The prefixes keep leaves, interior nodes and the root in separate domains,
+so no leaf can be passed off as a node; the root also binds the leaf size
+and file length. An empty file has one empty leaf.
+"""
+import mmap
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterable, List, Sequence, Tuple
+from .sha256_algo import Sha256
+
+DEFAULT_LEAF_SIZE = 1 << 20  # 1 MiB
+
+_LEAF = Sha256(b"\x00")
+_STATE_MAGIC = b"SHA256T1"
+_STATE_HEADER = struct.Struct(">8sQQQ")  # magic, leafSize, fileLength, leaf count
+
+def leafCount(length: int, leafSize: int) -> int:
+    return max(1, -(-length // leafSize))
+
+def _combine(level: List[bytes]) -> bytes:
+    while len(level) > 1:
+        nxt = [Sha256.hash(b"\x01" + level[i] + level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            nxt.append(level[-1])
+        level = nxt
+    return level[0]
+
+@dataclass
+class MerkleTree:
+    """Leaf hashes of one file; `digest` is the tree root."""
+    leafSize: int
+    length: int
+    leaves: List[bytes] = field(repr=False)
+
+    @property
+    def digest(self) -> bytes:
+        top = _combine(list(self.leaves))
+        return Sha256.hash(b"\x02" + struct.pack(">QQ", self.leafSize, self.length) + top)
+
+    def hexdigest(self) -> str:
+        return self.digest.hex()
+
+    def leafRange(self, index: int) -> Tuple[int, int]:
+        """Byte range [start, end) of leaf `index`."""
+        start = index * self.leafSize
+        return start, min(start + self.leafSize, self.length)
+
+    def save(self, path: str) -> None:
+        """Write the leaf state, so later runs can verify/re-hash single leaves."""
+        with open(path, "wb") as f:
+            f.write(_STATE_HEADER.pack(_STATE_MAGIC, self.leafSize, self.length, len(self.leaves)))
+            f.write(b"".join(self.leaves))
+
+    @staticmethod
+    def load(path: str) -> "MerkleTree":
+        with open(path, "rb") as f:
+            header = f.read(_STATE_HEADER.size)
+            if len(header) != _STATE_HEADER.size:
+                raise ValueError("Truncated tree state file")
+            magic, leafSize, length, count = _STATE_HEADER.unpack(header)
+            if magic != _STATE_MAGIC:
+                raise ValueError("Not a SHA-256 tree state file")
+            data = f.read()
+        if leafSize < 1 or len(data) != 32 * count or count != leafCount(length, leafSize):
+            raise ValueError("Corrupted tree state file")
+        return MerkleTree(leafSize, length, [data[i:i + 32] for i in range(0, len(data), 32)])
+
+def _hashLeaves(path: str, leafSize: int, indices: Sequence[int]) -> List[Tuple[int, bytes]]:
+    """Hash the given leaves of a file, reading them through one mmap."""
+    out = []
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return [(i, _LEAF.digest()) for i in indices]
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            for i in indices:
+                h = _LEAF.copy()
+                h.update(view[i * leafSize:(i + 1) * leafSize])
+                out.append((i, h.digest()))
+    return out
+
+def _hashLeavesParallel(path: str, leafSize: int, indices: List[int], jobs: int) -> List[Tuple[int, bytes]]:
+    if jobs <= 1 or len(indices) <= 1:
+        return _hashLeaves(path, leafSize, indices)
+    # a few tasks per worker, each a run of neighbouring leaves
+    tasks = min(len(indices), jobs * 4)
+    step = -(-len(indices) // tasks)
+    with ProcessPoolExecutor(max_workers=min(jobs, tasks)) as pool:
+        parts = pool.map(_hashLeaves, [path] * tasks, [leafSize] * tasks,
+                         [indices[i:i + step] for i in range(0, len(indices), step)])
+        return [pair for part in parts for pair in part]
+
+def treeHashFile(path: str, leafSize: int = DEFAULT_LEAF_SIZE, jobs: int = 1) -> MerkleTree:
+    """Hash every leaf of a file (in `jobs` processes) and return the tree."""
+    if leafSize < 1:
+        raise ValueError("leafSize must be >= 1")
+    length = os.path.getsize(path)
+    count = leafCount(length, leafSize)
+    leaves: List[bytes] = [b""] * count
+    for i, digest in _hashLeavesParallel(path, leafSize, list(range(count)), jobs):
+        leaves[i] = digest
+    return MerkleTree(leafSize, length, leaves)
+
+def changedLeaves(path: str, tree: MerkleTree, jobs: int = 1) -> List[int]:
+    """Re-hash a file against a saved tree; indices of the leaves that differ
+    (leaves past the end of the shorter version count as changed)."""
+    current = treeHashFile(path, tree.leafSize, jobs)
+    count = max(len(current.leaves), len(tree.leaves))
+    return [i for i in range(count)
+            if i >= len(current.leaves) or i >= len(tree.leaves) or current.leaves[i] != tree.leaves[i]]
+
+def leavesForRanges(ranges: Iterable[Tuple[int, int]], leafSize: int) -> List[int]:
+    """Leaf indices touched by the byte ranges (offset, length)."""
+    touched = set()
+    for offset, length in ranges:
+        if offset < 0 or length < 0:
+            raise ValueError("Ranges must be non-negative")
+        end = offset + max(length, 1)
+        touched.update(range(offset // leafSize, -(-end // leafSize)))
+    return sorted(touched)
+
+def rehashLeaves(path: str, tree: MerkleTree, indices: Iterable[int], jobs: int = 1) -> MerkleTree:
+    """Updated tree after the given leaves changed; only those leaves are read.
+
+    Leaves added or cut off by a change in file length are always re-hashed,
+    as is the old last leaf (it was partial or is now partial).
+    """
+    length = os.path.getsize(path)
+    count = leafCount(length, tree.leafSize)
+    leaves = list(tree.leaves[:count]) + [b""] * max(0, count - len(tree.leaves))
+    todo = {i for i in indices if 0 <= i < count}
+    if length != tree.length:
+        todo.update(range(min(len(tree.leaves), count) - 1, count))
+    for i, digest in _hashLeavesParallel(path, tree.leafSize, sorted(todo), jobs):
+        leaves[i] = digest
+    return MerkleTree(tree.leafSize, length, leaves)
@@ -1,2 +1,4 @@
-from .hybird_encrypt import HybirdEncryption, SignatureError
-from .client import UDPClient
\ No newline at end of file
+from .hybird_encrypt import HybirdEncryption, SignatureError, SessionError, RekeyPolicy
+from .client import UDPClient
+from .async_client import AsyncUDPClient, ReceivedMessage, EnvelopeProtocol
+from .relay import RelayServer, RelayStats
@@ -0,0 +1,157 @@
+"""asyncio datagram transport for digital envelopes.
+
+No polling: datagrams are pushed into a queue by the protocol as they arrive,
+and receive() awaits that queue. Sealing and opening envelopes (DES, HMAC and,
+on rekey, RSA) runs in an executor so the event loop keeps serving the socket
+meanwhile. The HybirdEncryption session state is not thread-safe, so each
+direction holds its own lock while it runs there.
+"""
+import asyncio
+import threading
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional, Tuple, Union
+from SecureCommClient.hybird_encrypt import HybirdEncryption
+from SecureCommClient.wire import WireCodec
+from SecureCommClient.client import seal_message
+
+Address = Tuple[str, int]
+
+@dataclass(frozen=True)
+class ReceivedMessage:
+    """One datagram: the plaintext, or the error that prevented opening it."""
+    addr: Address
+    text: Optional[str] = None
+    error: Optional[Exception] = None
+
+class EnvelopeProtocol(asyncio.DatagramProtocol):
+    """Pushes (datagram, addr) into a bounded queue, dropping when it is full, and
+    None when the transport closes. Shared by AsyncUDPClient and RelayServer."""
+
+    def __init__(self, queue: "asyncio.Queue[Optional[Tuple[bytes, Address]]]") -> None:
+        self.queue = queue
+        self.dropped = 0  # datagrams that arrived while the queue was full
+
+    def datagram_received(self, data: bytes, addr: Address) -> None:
+        try:
+            self.queue.put_nowait((data, addr))
+        except asyncio.QueueFull:
+            self.dropped += 1  # UDP semantics: shed load instead of buffering without bound
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        if self.queue.full():
+            # the sentinel must get in or receive()/serve() never return; shed the oldest datagram for it
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(None)  # ends receive()
+
+class AsyncUDPClient:
+    """Async counterpart of UDPClient: `await send(...)`, `async for m in receive()`.
+
+        async with AsyncUDPClient(host, port_listen, port_send, kernel) as client:
+            await client.send("hi")
+            async for message in client.receive():
+                print(message.text or message.error)
+    """
+
+    def __init__(self, host: str, port_listen: int, port_send: int, kernel_encryption: HybirdEncryption,
+                 wire_format: str = "auto", executor: Optional[Executor] = None, queue_size: int = 1024):
+        self.host = host
+        self.port_listen = port_listen
+        self.port_send = port_send
+        self.kernel_encryption = kernel_encryption
+        self.codec = WireCodec(wire_format)
+        self.executor = executor  # None = the loop's default thread pool
+        self._queue: "asyncio.Queue[Optional[Tuple[bytes, Address]]]" = asyncio.Queue(queue_size)
+        self._protocol = EnvelopeProtocol(self._queue)
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._send_lock = threading.Lock()
+        self._recv_lock = threading.Lock()
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._transport, _ = await loop.create_datagram_endpoint(
+            lambda: self._protocol, local_addr=("0.0.0.0", self.port_listen))
+
+    @property
+    def local_address(self) -> Address:
+        return self._transport.get_extra_info("sockname")
+
+    @property
+    def dropped(self) -> int:
+        return self._protocol.dropped
+
+    async def __aenter__(self) -> "AsyncUDPClient":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+
+    # ---------- sending ----------
+    def _seal(self, message: bytes) -> bytes:
+        with self._send_lock:
+            return seal_message(self.kernel_encryption, self.codec, message)
+
+    async def send(self, message: Union[str, bytes], addr: Optional[Address] = None) -> None:
+        """Encrypt in the executor, then hand the datagram to the transport (never blocks)."""
+        if self._transport is None:
+            raise RuntimeError("AsyncUDPClient is not started")
+        if isinstance(message, str):
+            message = message.encode()
+        data = await asyncio.get_running_loop().run_in_executor(self.executor, self._seal, message)
+        self._transport.sendto(data, addr or (self.host, self.port_send))
+
+    # ---------- receiving ----------
+    def _open(self, data: bytes) -> str:
+        with self._recv_lock:
+            envelope = self.codec.decode(data)
+            return self.kernel_encryption.decrypt_received_digital_envelope(envelope).decode(errors="replace")
+
+    async def receive(self) -> AsyncIterator[ReceivedMessage]:
+        """Yield every incoming datagram, opened, until the client is closed."""
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            data, addr = item
+            try:
+                text = await loop.run_in_executor(self.executor, self._open, data)
+            except Exception as e:  # SignatureError, SessionError, malformed datagram, ...
+                yield ReceivedMessage(addr=addr, error=e)
+            else:
+                yield ReceivedMessage(addr=addr, text=text)
+
+    def __aiter__(self) -> AsyncIterator[ReceivedMessage]:
+        return self.receive()
+
+if __name__ == "__main__":
+    # Example: Alice and Bob on localhost, each with its own AsyncUDPClient
+    from Crypto.rsapkg import Rsa
+
+    async def demo():
+        alice_rsa, bob_rsa, alice_sign, bob_sign = (Rsa.generate(bits=2048) for _ in range(4))
+        alice = HybirdEncryption.add_keys(alice_rsa.to_private_pem(), bob_rsa.to_public_pem(),
+                                          alice_sign.to_private_pem(), bob_sign.to_public_pem())
+        bob = HybirdEncryption.add_keys(bob_rsa.to_private_pem(), alice_rsa.to_public_pem(),
+                                        bob_sign.to_private_pem(), alice_sign.to_public_pem())
+        async with AsyncUDPClient("127.0.0.1", 9998, 9999, alice) as a, \
+                   AsyncUDPClient("127.0.0.1", 9999, 9998, bob) as b:
+            for i in range(3):
+                await a.send(f"Hello Bob #{i}")
+            received = b.receive()
+            for _ in range(3):
+                message = await received.__anext__()
+                print("Bob got:", message.text or message.error)
+                await b.send(f"ack: {message.text}")
+            async for message in a:
+                print("Alice got:", message.text or message.error)
+                if message.text == "ack: Hello Bob #2":
+                    break
+
+    asyncio.run(demo())
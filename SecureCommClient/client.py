@@ -1,31 +1,38 @@
-from SecureCommClient import HybirdEncryption, SignatureError
-import json
+from SecureCommClient import HybirdEncryption, SignatureError, SessionError
+from SecureCommClient.wire import WireCodec
 import socket
 import threading
 
+def seal_message(kernel_encryption: HybirdEncryption, codec: WireCodec, message: bytes) -> bytes:
+    """Session envelope once the peer is known to understand them (RSA only on rekey),
+    the per-message envelope that baseline peers read before that."""
+    if codec.peer_sessions:
+        envelope = kernel_encryption.create_session_envelope(message)
+    else:
+        envelope = kernel_encryption.create_digital_envelope(message)
+    return codec.encode(envelope)
+
 class UDPClient:
     """
     UDP client để gửi và nhận thông điệp mã hóa theo dạng 'digital envelope'.
     Không cần thiết lập kết nối (connectionless), mỗi lần gửi là một datagram riêng biệt.
     """
 
-    def __init__(self, host: str, port_listen: int, port_send: int, kernel_encryption: HybirdEncryption):
+    def __init__(self, host: str, port_listen: int, port_send: int, kernel_encryption: HybirdEncryption,
+                 wire_format: str = "auto"):
         self.host = host
         self.port_listen = port_listen
         self.post_send = port_send
         self.kernel_encryption = kernel_encryption
+        # "auto": gửi JSON (kèm "wire") cho tới khi thấy peer đọc được định dạng nhị phân
+        self.codec = WireCodec(wire_format)
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)  # UDP socket
         self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         self.socket.settimeout(2.0)  # tránh treo vĩnh viễn khi không có phản hồi
 
     def send_message(self, message: str):
         """Mã hóa và gửi thông điệp tới server qua UDP."""
-        envelope = self.kernel_encryption.create_digital_envelope(message.encode())
-        serialized_envelope = json.dumps({
-            "encrypted_des_key": envelope["encrypted_des_key"].hex(),
-            "encrypted_message": envelope["encrypted_message"].hex(),
-            "signature": envelope["signature"].hex()
-        }).encode()
+        serialized_envelope = seal_message(self.kernel_encryption, self.codec, message.encode())
         self.socket.sendto(serialized_envelope, (self.host, self.post_send))
         # print(f"Sent {len(serialized_envelope)} bytes to {self.host}:{self.post_send}")
 
@@ -34,12 +41,7 @@ class UDPClient:
         received_data, addr = self.socket.recvfrom(buffer_size)  # buffer size
         # print(f"Received {len(received_data)} bytes from {addr}")
 
-        envelope_dict = json.loads(received_data.decode())
-        envelope = {
-            "encrypted_des_key": bytes.fromhex(envelope_dict["encrypted_des_key"]),
-            "encrypted_message": bytes.fromhex(envelope_dict["encrypted_message"]),
-            "signature": bytes.fromhex(envelope_dict["signature"])
-        }
+        envelope = self.codec.decode(received_data)
         decrypted_message = self.kernel_encryption.decrypt_received_digital_envelope(envelope)
         return decrypted_message.decode(errors="replace")
 
@@ -75,16 +77,11 @@ class UDPClient:
                     continue
                 print(f"Received {len(received_data)} bytes from {addr}")
 
-                envelope_dict = json.loads(received_data.decode())
-                envelope = {
-                    "encrypted_des_key": bytes.fromhex(envelope_dict["encrypted_des_key"]),
-                    "encrypted_message": bytes.fromhex(envelope_dict["encrypted_message"]),
-                    "signature": bytes.fromhex(envelope_dict["signature"])
-                }
                 try:
+                    envelope = self.codec.decode(received_data)
                     decrypted_message = self.kernel_encryption.decrypt_received_digital_envelope(envelope)
                     print("Decrypted message:", decrypted_message.decode(errors="replace"))
-                except SignatureError as se:
+                except (SignatureError, SessionError, ValueError) as se:
                     print(se)
         except Exception as e:
             print(f"Error receiving message: {e}")
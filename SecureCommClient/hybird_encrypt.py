@@ -1,25 +1,110 @@
-from Crypto.despkg import DesCipher
+from Crypto.despkg import DesCipher, DesKeySchedule, get_key_schedule
 from Crypto.rsapkg import Rsa
-from dataclasses import dataclass
-from typing import Dict, Any
+from Crypto.sha256pkg import HmacSha256, hkdf
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional
 import secrets
+import time
 
 
 class SignatureError(Exception):
     pass
 
+class SessionError(Exception):
+    """Session envelope that cannot be used: unknown session, replayed or malformed."""
+    pass
+
+SESSION_ID_SIZE = 8
+SESSION_SECRET_SIZE = 32
+SENDER_ID_SIZE = 8  # leading bytes of the signing key's fingerprint
+CLOCK_SKEW = 60.0   # seconds a peer's clock may be ahead of ours
+
+@dataclass(frozen=True)
+class RekeyPolicy:
+    """When the sender replaces its session key; 0 / None disables a limit."""
+    max_messages: int = 1000         # envelopes per session key
+    max_bytes: int = 1 << 20         # plaintext bytes per session key
+    max_age: Optional[float] = 600.0 # seconds since the session key was made (also enforced by the receiver)
+    header_every: int = 8            # repeat the RSA header every N envelopes (UDP may drop the first)
+
+@dataclass
+class _SessionKeys:
+    """Keys derived from one session secret: DES for the data, HMAC for integrity."""
+    schedule: DesKeySchedule
+    mac: HmacSha256
+
+    @staticmethod
+    def derive(session_id: bytes, secret: bytes) -> "_SessionKeys":
+        des_key = hkdf(secret, 8, salt=session_id, info=b"des key")
+        mac_key = hkdf(secret, 32, salt=session_id, info=b"mac key")
+        return _SessionKeys(schedule=get_key_schedule(des_key), mac=HmacSha256(mac_key))
+
+@dataclass
+class _SendSession:
+    session_id: bytes
+    keys: _SessionKeys
+    encrypted_session_key: bytes  # secret under the peer's RSA key (OAEP)
+    signature: bytes              # our PSS signature over session_id || created_at || encrypted_session_key
+    created: float                # time.monotonic(), for the sender's own rekeying
+    created_at: int               # Unix time, sent in the signed header for the receiver's age check
+    seq: int = 0
+    bytes_sent: int = 0
+
+    def expired(self, policy: RekeyPolicy, next_len: int) -> bool:
+        return bool((policy.max_messages and self.seq >= policy.max_messages)
+                    or (policy.max_bytes and self.bytes_sent + next_len > policy.max_bytes and self.seq)
+                    or (policy.max_age and time.monotonic() - self.created >= policy.max_age))
+
+@dataclass
+class _RecvSession:
+    keys: _SessionKeys
+    encrypted_session_key: bytes
+    created_at: int
+    last_seq: int = -1
+    last_used: float = field(default_factory=time.monotonic)
+
+def _header_message(session_id: bytes, created_at: int, encrypted_session_key: bytes) -> bytes:
+    """What the session-key signature covers."""
+    return session_id + created_at.to_bytes(8, "big") + encrypted_session_key
+
+def _unwrap(rsa_private: Rsa, rsa_publicSign: Rsa, envelope: Dict[str, Any]) -> bytes:
+    session_id, created_at = envelope["session_id"], envelope["created"]
+    encrypted_session_key = envelope["encrypted_session_key"]
+    if not rsa_publicSign.verify(message=_header_message(session_id, created_at, encrypted_session_key),
+                                 signature=envelope["signature"],
+                                 padding="pss"):
+        raise SignatureError("Session key signature verification failed.")
+    return rsa_private.decrypt(ciphertext=encrypted_session_key, padding="oaep")
+
+def unwrap_session_key(private_key_pem: str, publicSign_key_pem: str, header: Dict[str, Any]) -> bytes:
+    """The RSA step of a session-key header on its own: verify the signature, decrypt
+    the secret. Stateless and picklable, so it can run in a process pool; hand the
+    result to decrypt_received_digital_envelope(..., session_secret=...)."""
+    return _unwrap(Rsa.from_private_pem(private_key_pem), Rsa.from_public_pem(publicSign_key_pem), header)
+
+HEADER_FIELDS = ("session_id", "created", "encrypted_session_key", "signature")
+
 @dataclass
 class HybirdEncryption:
     Rsa_private_Alice: Rsa
     Rsa_public_Bob: Rsa
     Rsa_privateSign_Alice: Rsa
     Rsa_publicSign_Bob: Rsa
+    rekey_policy: RekeyPolicy = field(default_factory=RekeyPolicy)
+    session_cache_size: int = 64  # unwrapped peer session keys kept by the receiver
+    retired_cache_size: int = 1024  # ids of evicted/expired peer sessions that must not come back
+    _send_session: Optional[_SendSession] = field(default=None, init=False, repr=False)
+    _recv_sessions: "OrderedDict[bytes, _RecvSession]" = field(default_factory=OrderedDict, init=False, repr=False)
+    _retired: "OrderedDict[bytes, None]" = field(default_factory=OrderedDict, init=False, repr=False)
+    _sender_id: Optional[bytes] = field(default=None, init=False, repr=False)
 
     @staticmethod
     def add_keys(private_key_pem_Alice: str,
                  public_key_pem_Bob: str,
                  privateSign_key_pem_Alice: str,
-                 publicSign_key_pem_Bob: str) -> "HybirdEncryption":
+                 publicSign_key_pem_Bob: str,
+                 rekey_policy: Optional[RekeyPolicy] = None) -> "HybirdEncryption":
 
         Rsa_private_Alice = Rsa.from_private_pem(private_key_pem_Alice)
         Rsa_public_Bob = Rsa.from_public_pem(public_key_pem_Bob)
@@ -29,7 +114,8 @@ class HybirdEncryption:
         return HybirdEncryption(Rsa_private_Alice=Rsa_private_Alice,
                                 Rsa_public_Bob=Rsa_public_Bob,
                                 Rsa_privateSign_Alice=Rsa_privateSign_Alice,
-                                Rsa_publicSign_Bob=Rsa_publicSign_Bob)
+                                Rsa_publicSign_Bob=Rsa_publicSign_Bob,
+                                rekey_policy=rekey_policy or RekeyPolicy())
 
     # generate a random DES session key
     def generate_des_key(self) -> bytes:
@@ -61,7 +147,10 @@ class HybirdEncryption:
             "signature": signature
         }
 
-    def decrypt_received_digital_envelope(self, envelope: Dict[str, Any]) -> bytes:
+    def decrypt_received_digital_envelope(self, envelope: Dict[str, Any],
+                                          session_secret: Optional[bytes] = None) -> bytes:
+        if "session_id" in envelope:
+            return self.decrypt_session_envelope(envelope, session_secret)
         encrypted_des_key = envelope["encrypted_des_key"]
         encrypted_message = envelope["encrypted_message"]
         signature = envelope["signature"]
@@ -84,6 +173,151 @@ class HybirdEncryption:
 
         return decrypted_message
 
+    # ---------- session mode: RSA once per session key, then DES + HMAC per message ----------
+    def rekey(self) -> None:
+        """Start a new session key with the next envelope."""
+        self._send_session = None
+
+    def reset_sessions(self) -> None:
+        """Forget our session key and every cached peer session key (their ids stay retired)."""
+        self._send_session = None
+        for session_id in list(self._recv_sessions):
+            self._retire(session_id)
+
+    def prune_idle(self, idle_timeout: float, now: Optional[float] = None) -> int:
+        """Retire peer sessions unused for idle_timeout seconds; returns how many went."""
+        now = time.monotonic() if now is None else now
+        pruned = 0
+        # the table is in least-recently-used order, so the idle ones are at the front
+        for session_id, session in list(self._recv_sessions.items()):
+            if now - session.last_used < idle_timeout:
+                break
+            self._retire(session_id)
+            pruned += 1
+        return pruned
+
+    def sender_id(self) -> bytes:
+        """Who we are to a multi-peer receiver: the start of our signing key's fingerprint."""
+        if self._sender_id is None:
+            self._sender_id = self.Rsa_privateSign_Alice.fingerprint()[:SENDER_ID_SIZE]
+        return self._sender_id
+
+    def _new_send_session(self) -> _SendSession:
+        session_id = secrets.token_bytes(SESSION_ID_SIZE)
+        secret = secrets.token_bytes(SESSION_SECRET_SIZE)
+        created_at = int(time.time())
+        encrypted_session_key = self.Rsa_public_Bob.encrypt(plaintext=secret, padding="oaep")
+        signature = self.Rsa_privateSign_Alice.sign(
+            message=_header_message(session_id, created_at, encrypted_session_key), padding="pss")
+        return _SendSession(session_id=session_id,
+                            keys=_SessionKeys.derive(session_id, secret),
+                            encrypted_session_key=encrypted_session_key,
+                            signature=signature,
+                            created=time.monotonic(),
+                            created_at=created_at)
+
+    def create_session_envelope(self, message: bytes) -> Dict[str, Any]:
+        """Envelope under the current session key; a new key is made when the policy says so.
+
+        Envelopes carrying the RSA header (the first one of a session, then every
+        header_every-th) also hold encrypted_session_key, signature, created and sender."""
+        session = self._send_session
+        if session is None or session.expired(self.rekey_policy, len(message)):
+            session = self._send_session = self._new_send_session()
+        seq = session.seq
+        session.seq += 1
+        session.bytes_sent += len(message)
+
+        iv = secrets.token_bytes(8)
+        encrypted_message = DesCipher.encrypt(plaintext=message, key=session.keys.schedule, iv=iv, mode="CBC")
+        seq_bytes = seq.to_bytes(8, "big")
+        envelope = {
+            "session_id": session.session_id,
+            "seq": seq,
+            "iv": iv,
+            "encrypted_message": encrypted_message,
+            "mac": session.keys.mac.mac(session.session_id + seq_bytes + iv + encrypted_message),
+        }
+        every = self.rekey_policy.header_every
+        if seq == 0 or (every and seq % every == 0):
+            envelope["encrypted_session_key"] = session.encrypted_session_key
+            envelope["signature"] = session.signature
+            envelope["created"] = session.created_at
+            envelope["sender"] = self.sender_id()
+        return envelope
+
+    def _retire(self, session_id: bytes) -> None:
+        self._recv_sessions.pop(session_id, None)
+        self._retired[session_id] = None
+        while len(self._retired) > self.retired_cache_size:
+            self._retired.popitem(last=False)
+
+    def _too_old(self, created_at: int) -> bool:
+        max_age = self.rekey_policy.max_age
+        age = time.time() - created_at
+        return age < -CLOCK_SKEW or bool(max_age and age > max_age + CLOCK_SKEW)
+
+    def _cached_session(self, envelope: Dict[str, Any]) -> Optional[_RecvSession]:
+        session = self._recv_sessions.get(envelope["session_id"])
+        encrypted_session_key = envelope.get("encrypted_session_key")
+        if session is not None and (encrypted_session_key is None
+                                    or encrypted_session_key == session.encrypted_session_key):
+            return session
+        return None
+
+    def _check_header(self, envelope: Dict[str, Any]) -> None:
+        if "encrypted_session_key" not in envelope:
+            raise SessionError("Unknown session; waiting for its key header.")
+        if envelope["session_id"] in self._retired:
+            raise SessionError("Session was retired; it cannot be re-established.")
+        if self._too_old(envelope["created"]):
+            raise SessionError("Session key header is too old (or from the future).")
+
+    def needs_unwrap(self, envelope: Dict[str, Any]) -> bool:
+        """Whether opening this envelope takes the RSA header step (a session not seen
+        yet). Raises SessionError for a header that would be refused anyway."""
+        if "session_id" not in envelope or self._cached_session(envelope) is not None:
+            return False
+        self._check_header(envelope)
+        return True
+
+    def _recv_session(self, envelope: Dict[str, Any], session_secret: Optional[bytes] = None) -> _RecvSession:
+        """The peer session an envelope belongs to. Replay protection lives in the
+        sessions: evicted or expired ones are retired and never recreated, and a
+        header older than max_age is refused before any RSA work. session_secret is
+        the header already unwrapped by unwrap_session_key (e.g. in another process)."""
+        session_id = envelope["session_id"]
+        session = self._cached_session(envelope)
+        if session is not None:
+            if self._too_old(session.created_at):
+                self._retire(session_id)
+                raise SessionError("Session expired.")
+            self._recv_sessions.move_to_end(session_id)
+            session.last_used = time.monotonic()
+            return session
+        self._check_header(envelope)
+        if session_secret is None:
+            session_secret = _unwrap(self.Rsa_private_Alice, self.Rsa_publicSign_Bob, envelope)
+        session = _RecvSession(keys=_SessionKeys.derive(session_id, session_secret),
+                               encrypted_session_key=envelope["encrypted_session_key"],
+                               created_at=envelope["created"])
+        self._recv_sessions[session_id] = session
+        while len(self._recv_sessions) > self.session_cache_size:
+            self._retire(next(iter(self._recv_sessions)))
+        return session
+
+    def decrypt_session_envelope(self, envelope: Dict[str, Any], session_secret: Optional[bytes] = None) -> bytes:
+        session_id, seq = envelope["session_id"], envelope["seq"]
+        iv, encrypted_message = envelope["iv"], envelope["encrypted_message"]
+        session = self._recv_session(envelope, session_secret)
+        if not session.keys.mac.verify(session_id + seq.to_bytes(8, "big") + iv + encrypted_message, envelope["mac"]):
+            raise SignatureError("Session MAC verification failed.")
+        # sequence numbers only grow within a session: anything not newer is a replay
+        if seq <= session.last_seq:
+            raise SessionError(f"Replayed or reordered envelope (seq {seq}).")
+        session.last_seq = seq
+        return DesCipher.decrypt(ciphertext=encrypted_message, key=session.keys.schedule, iv=iv, mode="CBC")
+
 if __name__ == "__main__":
     # Example usage
     from Crypto.rsapkg import Rsa
@@ -0,0 +1,139 @@
+"""Local load generator for RelayServer.
+
+Starts a relay in echo mode in a child process, then drives it from many
+simulated peers (one UDP socket each) with a closed loop: at most --window
+envelopes are in flight, and every echoed datagram lets the next one go.
+Envelopes are sealed before the clock starts and replies are only counted,
+not opened, so the measured rate is the relay's: open + verify + reseal.
+
+    python -m SecureCommClient.loadgen --peers 500 --messages 20
+    python -m SecureCommClient.loadgen --header-workers 0   # threads only, for comparison
+"""
+import argparse
+import asyncio
+import multiprocessing
+import selectors
+import socket
+import time
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+from Crypto.rsapkg import Rsa
+from SecureCommClient.hybird_encrypt import HybirdEncryption
+from SecureCommClient.relay import RelayServer
+from SecureCommClient.wire import WireCodec
+
+def _run_relay(conn, server_pems: Tuple[str, str], peer_pems: List[Tuple[str, str]], workers: int,
+               header_workers: Optional[int]) -> None:
+    """Child process: serve until the parent sends "stop", then report the stats."""
+    async def main():
+        server = RelayServer(*server_pems, host="127.0.0.1", port=0, relay="echo", workers=workers,
+                             header_workers=header_workers)
+        for pems in peer_pems:
+            server.register_peer(*pems)
+        await server.start()
+        conn.send(server.local_address[1])
+        serving = asyncio.create_task(server.serve())
+        await asyncio.get_running_loop().run_in_executor(None, conn.recv)
+        server.close()
+        await serving
+        conn.send(server.stats())
+    asyncio.run(main())
+
+def _percentile(values: List[float], q: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+def main():
+    parser = argparse.ArgumentParser(prog="relay-loadgen", description="Benchmark RelayServer on localhost.")
+    parser.add_argument("--peers", type=int, default=200, help="Simulated peers, one UDP socket each (default: 200)")
+    parser.add_argument("--messages", type=int, default=20, help="Messages per peer (default: 20)")
+    parser.add_argument("--identities", type=int, default=4,
+                        help="Distinct key pairs shared round-robin by the peers (default: 4)")
+    parser.add_argument("--bits", type=int, default=2048, help="RSA key size (default: 2048)")
+    parser.add_argument("--size", type=int, default=64, help="Message size in bytes (default: 64)")
+    parser.add_argument("--window", type=int, default=64, help="Envelopes in flight (default: 64)")
+    parser.add_argument("--workers", type=int, default=4, help="Relay worker threads (default: 4)")
+    parser.add_argument("--header-workers", type=int, default=None,
+                        help="Relay processes for session-key headers (default: one per core; 0 = threads only)")
+    parser.add_argument("--timeout", type=float, default=5.0, help="Give up after this long without a reply")
+    args = parser.parse_args()
+
+    print(f"Generating {2 * (args.identities + 1)} RSA-{args.bits} keys ...")
+    server_enc, server_sign = Rsa.generate(args.bits), Rsa.generate(args.bits)
+    identities = [(Rsa.generate(args.bits), Rsa.generate(args.bits)) for _ in range(args.identities)]
+
+    conn, child_conn = multiprocessing.Pipe()
+    # not a daemon: the relay starts its own header worker processes
+    relay = multiprocessing.Process(target=_run_relay, args=(
+        child_conn, (server_enc.to_private_pem(), server_sign.to_private_pem()),
+        [(enc.to_public_pem(), sign.to_public_pem()) for enc, sign in identities], args.workers,
+        args.header_workers))
+    relay.start()
+    child_conn.close()  # a relay that dies now shows up as EOFError instead of a hang
+    port = conn.recv()
+
+    print(f"Sealing {args.peers * args.messages} envelopes for {args.peers} peers ...")
+    message = b"x" * args.size
+    sockets, outgoing = [], []
+    for i in range(args.peers):
+        enc, sign = identities[i % len(identities)]
+        kernel = HybirdEncryption.add_keys(enc.to_private_pem(), server_enc.to_public_pem(),
+                                           sign.to_private_pem(), server_sign.to_public_pem())
+        codec = WireCodec("binary")
+        outgoing.append(deque(codec.encode(kernel.create_session_envelope(message)) for _ in range(args.messages)))
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.bind(("127.0.0.1", 0))
+        sock.setblocking(False)
+        sockets.append(sock)
+
+    selector = selectors.DefaultSelector()
+    for i, sock in enumerate(sockets):
+        selector.register(sock, selectors.EVENT_READ, i)
+    sent_at: List[Deque[float]] = [deque() for _ in sockets]
+    latencies: List[float] = []
+    target = ("127.0.0.1", port)
+    total = args.peers * args.messages
+    sent = replies = inflight = 0
+    turn = 0
+    start = last_reply = time.perf_counter()
+    while replies < total:
+        while inflight < args.window and sent < total:
+            while not outgoing[turn]:
+                turn = (turn + 1) % len(sockets)
+            sockets[turn].sendto(outgoing[turn].popleft(), target)
+            sent_at[turn].append(time.perf_counter())
+            sent += 1
+            inflight += 1
+            turn = (turn + 1) % len(sockets)
+        events = selector.select(timeout=0.5)
+        now = time.perf_counter()
+        for key, _ in events:
+            i = key.data
+            while True:
+                try:
+                    key.fileobj.recv(65536)
+                except BlockingIOError:
+                    break
+                latencies.append(now - sent_at[i].popleft())
+                replies += 1
+                inflight -= 1
+                last_reply = now
+        if not events and now - last_reply > args.timeout:
+            print(f"No reply for {args.timeout}s, {inflight} envelopes lost; stopping.")
+            break
+    elapsed = last_reply - start
+
+    conn.send("stop")
+    stats = conn.recv()
+    relay.join(5)
+    if relay.is_alive():
+        relay.terminate()
+    for sock in sockets:
+        sock.close()
+
+    executor = "threads only" if args.header_workers == 0 else f"header processes: {args.header_workers or 'one per core'}"
+    print(f"{replies}/{total} round trips in {elapsed:.2f}s: {replies / elapsed:.0f} msg/s ({executor})")
+    print(f"latency p50 {_percentile(latencies, 0.5) * 1e3:.1f} ms, p99 {_percentile(latencies, 0.99) * 1e3:.1f} ms")
+    print(stats)
+
+if __name__ == "__main__":
+    main()
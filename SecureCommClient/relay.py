@@ -0,0 +1,295 @@
+"""Multi-peer relay: many peers on one UDP port.
+
+Peers are registered up front with their public keys and indexed by key
+fingerprint (HybirdEncryption.sender_id). A source address is bound to a peer
+by the first envelope from it that carries a session-key header, which names
+its sender; later envelopes from that address are matched by address alone.
+Peers therefore talk to a relay in session mode from the first datagram
+(wire_format="binary"); the per-message envelopes a WireCodec in "auto" mode
+starts with carry no sender and are refused.
+
+Receive state (session keys, replay counters, retired session ids) belongs to
+the sender identity, not to the address: a header captured from one port and
+replayed from another hits the same counters. A binding is built off to the
+side and only installed once its envelope has opened, so a spoofed datagram
+can neither create nor replace one. Each bound address keeps its own
+HybirdEncryption for the copies sealed to it, and its own WireCodec.
+
+Crypto runs off the event loop in two pools. RSA, DES and HMAC here are pure
+Python and hold the GIL, so threads alone would keep the relay on one core.
+The expensive, stateless step (verifying a session-key header and unwrapping
+its secret, unwrap_session_key) therefore goes to a process pool, one worker
+per core by default; the secret comes back to the sender's kernel, which
+derives the session keys and does the cheap per-message DES + HMAC work on a
+thread pool. An asyncio.Lock per address keeps its envelopes in arrival order
+(the replay check rejects reordering) and one per sender serialises access to
+that sender's kernel, while different peers proceed concurrently.
+Addresses idle for idle_timeout seconds are evicted with their send state,
+and each sender's receive sessions idle that long are retired.
+
+relay modes:
+    "broadcast"  forward every message to all other bound addresses
+    "echo"       send it back to its sender (used by the load generator)
+    "none"       only count it
+"""
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+from Crypto.rsapkg import Rsa
+from SecureCommClient.hybird_encrypt import (HybirdEncryption, RekeyPolicy, SignatureError, SessionError,
+                                             SENDER_ID_SIZE, HEADER_FIELDS, unwrap_session_key)
+from SecureCommClient.async_client import EnvelopeProtocol
+from SecureCommClient.wire import WireCodec
+
+Address = Tuple[str, int]
+RELAY_MODES = ("broadcast", "echo", "none")
+
+def _warm_up() -> None:
+    """Runs in each header worker once; importing this module there pulls in the crypto code."""
+
+@dataclass(frozen=True)
+class RelayStats:
+    peers: int      # registered identities
+    addresses: int  # currently bound source addresses
+    received: int   # envelopes opened successfully
+    relayed: int    # envelopes sent out
+    errors: int     # datagrams rejected (bad signature/MAC, unknown peer, malformed, replay)
+    dropped: int    # datagrams shed because the receive queue was full
+    evicted: int    # bindings and peer receive sessions removed for being idle
+
+@dataclass
+class _Peer:
+    public_key_pem: str
+    publicSign_key_pem: str
+    kernel: HybirdEncryption  # receive side, shared by every address of this sender
+    lock: asyncio.Lock
+
+@dataclass
+class _Binding:
+    sender: bytes
+    kernel: HybirdEncryption  # send side, for the copies relayed to this address
+    codec: WireCodec
+    lock: asyncio.Lock
+    last_seen: float
+
+class RelayServer:
+    """See the module docstring. Use as `async with RelayServer(...) as server: await server.serve()`.
+
+    The header pool starts its processes with spawn, so a script that runs a relay
+    needs the usual `if __name__ == "__main__":` guard around it."""
+
+    def __init__(self, private_key_pem: str, privateSign_key_pem: str, host: str = "0.0.0.0", port: int = 0,
+                 relay: str = "broadcast", idle_timeout: float = 300.0, workers: int = 4,
+                 max_inflight: int = 256, queue_size: int = 4096, rekey_policy: Optional[RekeyPolicy] = None,
+                 executor: Optional[Executor] = None, sessions_per_peer: int = 1024,
+                 header_workers: Optional[int] = None, header_executor: Optional[Executor] = None):
+        if relay not in RELAY_MODES:
+            raise ValueError(f"relay must be one of {RELAY_MODES}")
+        self.private_key_pem = private_key_pem
+        self.privateSign_key_pem = privateSign_key_pem
+        self.host = host
+        self.port = port
+        self.relay = relay
+        self.idle_timeout = idle_timeout
+        self.rekey_policy = rekey_policy
+        self.max_inflight = max_inflight
+        self.sessions_per_peer = sessions_per_peer  # one sender identity may be in use from many addresses
+        self._own_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(max_workers=workers, thread_name_prefix="relay")
+        # header_workers=0: no process pool, the kernels unwrap headers on the thread pool
+        self._own_header_executor = header_executor is None and header_workers != 0
+        self.header_workers = header_workers or os.cpu_count() or 1
+        if self._own_header_executor:
+            # spawn, not fork: the parent already runs the event loop and worker threads
+            header_executor = ProcessPoolExecutor(max_workers=self.header_workers,
+                                                  mp_context=multiprocessing.get_context("spawn"))
+        self.header_executor = header_executor
+        self._peers: Dict[bytes, _Peer] = {}
+        self._bindings: Dict[Address, _Binding] = {}
+        self._pending: Dict[Address, _Binding] = {}  # candidates whose first envelope is still being opened
+        self._queue: "asyncio.Queue[Optional[Tuple[bytes, Address]]]" = asyncio.Queue(queue_size)
+        self._protocol = EnvelopeProtocol(self._queue)
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._received = 0
+        self._relayed = 0
+        self._errors = 0
+        self._evicted = 0
+
+    # ---------- peers ----------
+    def register_peer(self, public_key_pem: str, publicSign_key_pem: str) -> bytes:
+        """Allow a peer to connect; returns its sender id (fingerprint prefix of its signing key)."""
+        sender = Rsa.from_public_pem(publicSign_key_pem).fingerprint()[:SENDER_ID_SIZE]
+        kernel = self._kernel(public_key_pem, publicSign_key_pem)
+        kernel.session_cache_size = self.sessions_per_peer
+        self._peers[sender] = _Peer(public_key_pem, publicSign_key_pem, kernel, asyncio.Lock())
+        return sender
+
+    def unregister_peer(self, sender: bytes) -> None:
+        self._peers.pop(sender, None)
+        for addr in [a for a, b in self._bindings.items() if b.sender == sender]:
+            del self._bindings[addr]
+
+    def _kernel(self, public_key_pem: str, publicSign_key_pem: str) -> HybirdEncryption:
+        # PEM parsing and key contexts are cached, so a new kernel costs no key setup
+        return HybirdEncryption.add_keys(self.private_key_pem, public_key_pem,
+                                         self.privateSign_key_pem, publicSign_key_pem,
+                                         rekey_policy=self.rekey_policy)
+
+    def _candidate(self, addr: Address, sender: Optional[bytes], codec: WireCodec) -> _Binding:
+        """Binding for a new (or re-keyed) address; not installed until its envelope opens."""
+        if sender is None:
+            raise SessionError(f"Unknown address {addr}; waiting for a session-key header.")
+        peer = self._peers.get(sender)
+        if peer is None:
+            raise SessionError(f"Unregistered sender {sender.hex()}.")
+        return _Binding(sender=sender, kernel=self._kernel(peer.public_key_pem, peer.publicSign_key_pem),
+                        codec=codec, lock=asyncio.Lock(), last_seen=time.monotonic())
+
+    # ---------- lifecycle ----------
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._transport, _ = await loop.create_datagram_endpoint(
+            lambda: self._protocol, local_addr=(self.host, self.port))
+        if self._own_header_executor:
+            # boot the spawned workers now, not on the first peer's header
+            await asyncio.gather(*(loop.run_in_executor(self.header_executor, _warm_up)
+                                   for _ in range(self.header_workers)))
+
+    @property
+    def local_address(self) -> Address:
+        return self._transport.get_extra_info("sockname")
+
+    async def __aenter__(self) -> "RelayServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop receiving; serve() returns once the datagrams in flight are handled."""
+        if self._transport is not None:
+            self._transport.close()
+
+    async def serve(self) -> None:
+        if self._transport is None:
+            await self.start()
+        inflight = asyncio.Semaphore(self.max_inflight)
+        sweeper = asyncio.create_task(self._sweep())
+        try:
+            while True:
+                item = await self._queue.get()
+                if item is None:
+                    break
+                await inflight.acquire()  # backpressure: the queue fills up, then the protocol drops
+                task = asyncio.create_task(self._handle(*item))
+                self._tasks.add(task)
+                task.add_done_callback(lambda t: (self._tasks.discard(t), inflight.release()))
+        finally:
+            sweeper.cancel()
+            if self._tasks:
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+            if self._own_executor:
+                self.executor.shutdown(wait=False)
+            if self._own_header_executor:
+                self.header_executor.shutdown(wait=False, cancel_futures=True)
+
+    # ---------- datagrams ----------
+    async def _handle(self, data: bytes, addr: Address) -> None:
+        loop = asyncio.get_running_loop()
+        # an address still being proven queues behind its candidate, so its header is opened first
+        binding = self._bindings.get(addr) or self._pending.get(addr)
+        candidate = None
+        try:
+            codec = binding.codec if binding is not None else WireCodec()
+            envelope = codec.decode(data)  # cheap, stays on the loop
+            sender = envelope.get("sender")
+            if binding is None or (sender is not None and sender != binding.sender):
+                if binding is not None:  # the current binding keeps its codec until the new one is proven
+                    codec = WireCodec()
+                    codec.decode(data)
+                binding = candidate = self._candidate(addr, sender, codec)
+                self._pending.setdefault(addr, candidate)
+            peer = self._peers.get(binding.sender)
+            if peer is None:
+                raise SessionError(f"Unregistered sender {binding.sender.hex()}.")
+            async with binding.lock:
+                secret = None
+                if self.header_executor is not None:
+                    async with peer.lock:
+                        unwrap = peer.kernel.needs_unwrap(envelope)
+                    if unwrap:
+                        header = {name: envelope[name] for name in HEADER_FIELDS}
+                        secret = await loop.run_in_executor(self.header_executor, unwrap_session_key,
+                                                            self.private_key_pem, peer.publicSign_key_pem, header)
+                async with peer.lock:
+                    message = await loop.run_in_executor(self.executor, peer.kernel.decrypt_received_digital_envelope,
+                                                         envelope, secret)
+        except (SignatureError, SessionError, ValueError, KeyError, TypeError, AttributeError, OverflowError):
+            self._errors += 1
+            return
+        finally:
+            if candidate is not None and self._pending.get(addr) is candidate:
+                del self._pending[addr]
+        # authenticated: only now may this envelope create or replace the address binding
+        current = self._bindings.get(addr)
+        if current is None or current.sender != binding.sender:
+            self._bindings[addr] = binding
+        else:
+            binding = current  # a concurrent first envelope got there first
+        binding.last_seen = time.monotonic()
+        self._received += 1
+        targets = self._targets(addr)
+        if targets:
+            await asyncio.gather(*(self._send(target, message) for target in targets))
+
+    def _targets(self, addr: Address) -> List[Address]:
+        if self.relay == "echo":
+            return [addr]
+        if self.relay == "broadcast":
+            return [a for a in self._bindings if a != addr]
+        return []
+
+    def _seal(self, binding: _Binding, message: bytes) -> bytes:
+        return binding.codec.encode(binding.kernel.create_session_envelope(message))
+
+    async def _send(self, addr: Address, message: bytes) -> None:
+        binding = self._bindings.get(addr)
+        if binding is None:
+            return
+        async with binding.lock:
+            data = await asyncio.get_running_loop().run_in_executor(self.executor, self._seal, binding, message)
+        if self._transport is not None and not self._transport.is_closing():
+            self._transport.sendto(data, addr)
+            self._relayed += 1
+
+    async def _sweep(self) -> None:
+        interval = max(1.0, self.idle_timeout / 4)
+        while True:
+            await asyncio.sleep(interval)
+            self.evict_idle()
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Drop bindings and retire peer receive sessions idle for idle_timeout seconds;
+        returns how many went."""
+        now = time.monotonic() if now is None else now
+        idle = [addr for addr, b in self._bindings.items()
+                if now - b.last_seen >= self.idle_timeout and not b.lock.locked()]
+        for addr in idle:
+            self._bindings.pop(addr)
+        evicted = len(idle)
+        for peer in self._peers.values():
+            if not peer.lock.locked():  # a kernel in use on the pool is swept next time
+                evicted += peer.kernel.prune_idle(self.idle_timeout, now)
+        self._evicted += evicted
+        return evicted
+
+    def stats(self) -> RelayStats:
+        return RelayStats(peers=len(self._peers), addresses=len(self._bindings), received=self._received,
+                          relayed=self._relayed, errors=self._errors, dropped=self._protocol.dropped,
+                          evicted=self._evicted)
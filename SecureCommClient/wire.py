@@ -0,0 +1,178 @@
+"""Datagram encodings of HybirdEncryption envelopes.
+
+Binary framing (all integers big-endian):
+    magic   2 bytes  b"HB"
+    version 1 byte   WIRE_VERSION
+    flags   1 byte   FLAG_SESSION, FLAG_KEY_HEADER, FLAG_SENDER
+    session envelope:  session_id (8) | seq (u64) | iv (8) | mac (32) | encrypted_message
+                       [| encrypted_session_key | signature | created (u64)]   when FLAG_KEY_HEADER
+                       [| sender]                              when FLAG_SENDER
+    per-message envelope: encrypted_des_key | encrypted_message | signature
+Variable fields carry a u16 length prefix (a UDP datagram is at most 64 KiB).
+
+JSON (the older format, every bytes field hex-encoded) starts with "{", so a
+receiver tells the two apart from the first byte. A JSON sender that can also
+read binary says so with "wire": WIRE_VERSION; old peers ignore the key.
+The sender field comes last so that decoders predating it simply ignore it.
+"""
+import json
+import struct
+from typing import Any, Dict, Tuple
+
+WIRE_FORMATS = ("auto", "binary", "json")
+
+MAGIC = b"HB"
+WIRE_VERSION = 1
+FLAG_SESSION = 0x01
+FLAG_KEY_HEADER = 0x02
+FLAG_SENDER = 0x04
+
+_HEADER = struct.Struct(">2sBB")
+_SESSION = struct.Struct(">8sQ8s32s")  # session_id, seq, iv, mac
+_LENGTH = struct.Struct(">H")
+_CREATED = struct.Struct(">Q")  # Unix time the session key was made
+
+def is_binary(data: bytes) -> bool:
+    return data[:2] == MAGIC
+
+def _put(out: bytearray, field: bytes) -> None:
+    if len(field) > 0xFFFF:
+        raise ValueError("Envelope field too long for one datagram")
+    out += _LENGTH.pack(len(field))
+    out += field
+
+def _take(view: memoryview, pos: int) -> Tuple[bytes, int]:
+    """Field at pos and the position after it; the datagram itself is never sliced or copied."""
+    if pos + _LENGTH.size > len(view):
+        raise ValueError("Truncated envelope")
+    (length,) = _LENGTH.unpack_from(view, pos)
+    pos += _LENGTH.size
+    if pos + length > len(view):
+        raise ValueError("Truncated envelope")
+    (field,) = struct.unpack_from(f"{length}s", view, pos)
+    return field, pos + length
+
+def encode_binary(envelope: Dict[str, Any]) -> bytes:
+    if "session_id" in envelope:
+        header, sender = "encrypted_session_key" in envelope, envelope.get("sender")
+        flags = FLAG_SESSION | (FLAG_KEY_HEADER if header else 0) | (FLAG_SENDER if sender else 0)
+        out = bytearray(_HEADER.pack(MAGIC, WIRE_VERSION, flags))
+        out += _SESSION.pack(envelope["session_id"], envelope["seq"], envelope["iv"], envelope["mac"])
+        _put(out, envelope["encrypted_message"])
+        if header:
+            _put(out, envelope["encrypted_session_key"])
+            _put(out, envelope["signature"])
+            out += _CREATED.pack(envelope["created"])
+        if sender:
+            _put(out, sender)
+    else:
+        out = bytearray(_HEADER.pack(MAGIC, WIRE_VERSION, 0))
+        for name in ("encrypted_des_key", "encrypted_message", "signature"):
+            _put(out, envelope[name])
+    return bytes(out)
+
+def decode_binary(data: bytes) -> Dict[str, Any]:
+    view = memoryview(data)
+    if len(view) < _HEADER.size:
+        raise ValueError("Truncated envelope")
+    magic, version, flags = _HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError("Not a binary envelope")
+    if version != WIRE_VERSION:
+        raise ValueError(f"Unsupported envelope version {version}")
+    pos = _HEADER.size
+    if not flags & FLAG_SESSION:
+        envelope = {}
+        for name in ("encrypted_des_key", "encrypted_message", "signature"):
+            envelope[name], pos = _take(view, pos)
+        return envelope
+    if pos + _SESSION.size > len(view):
+        raise ValueError("Truncated envelope")
+    session_id, seq, iv, mac = _SESSION.unpack_from(view, pos)
+    envelope = {"session_id": session_id, "seq": seq, "iv": iv, "mac": mac}
+    envelope["encrypted_message"], pos = _take(view, pos + _SESSION.size)
+    if flags & FLAG_KEY_HEADER:
+        envelope["encrypted_session_key"], pos = _take(view, pos)
+        envelope["signature"], pos = _take(view, pos)
+        if pos + _CREATED.size > len(view):
+            raise ValueError("Truncated envelope")
+        (envelope["created"],) = _CREATED.unpack_from(view, pos)
+        pos += _CREATED.size
+    if flags & FLAG_SENDER:
+        envelope["sender"], pos = _take(view, pos)
+    return envelope
+
+def encode_json(envelope: Dict[str, Any], advertise: bool = False) -> bytes:
+    """JSON datagram: bytes fields hex-encoded, integers (seq) as they are."""
+    obj = {k: v.hex() if isinstance(v, bytes) else v for k, v in envelope.items()}
+    if advertise:
+        obj["wire"] = WIRE_VERSION
+    return json.dumps(obj).encode()
+
+_LEGACY_FIELDS = frozenset(("encrypted_des_key", "encrypted_message", "signature"))
+_SESSION_FIELDS = frozenset(("session_id", "seq", "iv", "mac", "encrypted_message"))
+_KEY_HEADER_FIELDS = frozenset(("encrypted_session_key", "signature", "created"))
+_INT_FIELDS = ("seq", "created")
+_FIXED_SIZES = {"session_id": 8, "iv": 8, "mac": 32}
+
+def _u64(name: str, value: Any) -> int:
+    if type(value) is not int or not 0 <= value < 1 << 64:
+        raise ValueError(f"Envelope field {name} must be an integer in [0, 2**64)")
+    return value
+
+def decode_json(data: bytes) -> Tuple[Dict[str, Any], int]:
+    """Envelope plus the binary version the sender advertised (0 = none).
+
+    Only the exact field sets encode_binary knows are accepted, with the same
+    types, so a malformed datagram is a ValueError and never reaches the kernel."""
+    obj = json.loads(data.decode())
+    if not isinstance(obj, dict):
+        raise ValueError("Envelope must be a JSON object")
+    wire = _u64("wire", obj.pop("wire", 0))
+    fields = obj.keys() - {"sender"}  # only session envelopes name their sender
+    legacy = fields == _LEGACY_FIELDS and "sender" not in obj
+    if not legacy and fields not in (_SESSION_FIELDS, _SESSION_FIELDS | _KEY_HEADER_FIELDS):
+        raise ValueError("Envelope has an unexpected set of fields")
+    envelope = {}
+    for name, value in obj.items():
+        if name in _INT_FIELDS:
+            envelope[name] = _u64(name, value)
+            continue
+        if not isinstance(value, str):
+            raise ValueError(f"Envelope field {name} must be a hex string")
+        envelope[name] = bytes.fromhex(value)
+        if name in _FIXED_SIZES and len(envelope[name]) != _FIXED_SIZES[name]:
+            raise ValueError(f"Envelope field {name} must be {_FIXED_SIZES[name]} bytes")
+    return envelope, wire
+
+class WireCodec:
+    """Per-peer format choice: "auto" sends JSON (advertising binary) until the
+    peer is seen to use or advertise binary, then switches; "binary"/"json" are fixed.
+
+    peer_sessions records whether the peer understands session envelopes: any
+    peer that speaks or advertises wire version 1 does, and so does one that
+    sends session envelopes itself. Baseline peers only know per-message ones."""
+
+    def __init__(self, wire_format: str = "auto") -> None:
+        if wire_format not in WIRE_FORMATS:
+            raise ValueError(f"wire_format must be one of {WIRE_FORMATS}")
+        self.wire_format = wire_format
+        self.peer_binary = wire_format == "binary"
+        self.peer_sessions = self.peer_binary
+
+    def encode(self, envelope: Dict[str, Any]) -> bytes:
+        if self.wire_format != "json" and self.peer_binary:
+            return encode_binary(envelope)
+        return encode_json(envelope, advertise=self.wire_format == "auto")
+
+    def decode(self, data: bytes) -> Dict[str, Any]:
+        """Datagram in either format."""
+        if is_binary(data):
+            self.peer_binary = self.peer_sessions = True
+            return decode_binary(data)
+        envelope, wire = decode_json(data)
+        if wire >= WIRE_VERSION:
+            self.peer_binary = self.peer_sessions = True
+        elif "session_id" in envelope:
+            self.peer_sessions = True
+        return envelope
@@ -5,6 +5,10 @@ ALICE_PUBLIC_KEY_PATH = f"{KEY_DIRS}/alice_public.pem"
 ALICE_SIGN_PRIVATE_KEY_PATH = f"{KEY_DIRS}/alice_sign_private.pem"
 # BOB_SIGN_PUBLIC_KEY_PATH = f"{KEY_DIRS}/bob_sign_public.pem"
 ALICE_SIGN_PUBLIC_KEY_PATH = f"{KEY_DIRS}/alice_sign_public.pem"
+# pre-generated key pairs (private keys!), refilled in the background
+KEY_POOL_PATH = f"{KEY_DIRS}/keypool.json"
+KEY_POOL_SIZE = 2
+KEY_POOL_WAIT = 1.0  # seconds option 0 waits for the pool before giving up
 
 CERT_DIRS = "./data/certs"
 ALICE_CERT_PATH = f"{CERT_DIRS}/alice.crt"
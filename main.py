@@ -5,9 +5,9 @@ import socket
 import json
 import time
 from typing import Optional
-from SecureCommClient import UDPClient, SignatureError, HybirdEncryption
+from SecureCommClient import UDPClient, SignatureError, SessionError, HybirdEncryption
 from interface import ConsoleMenu
-from Crypto.rsapkg import generateKeyPair, RsaKeyPair
+from Crypto.rsapkg import RsaKeyPair, KeyPool
 from config import *
 from untils import *
 
@@ -26,6 +26,8 @@ class MainApp:
         self.listener = None
         self.buffer = ""
         self.nick_name = None
+        # the refill thread starts now, so option 0 finds key pairs already made
+        self.key_pool = KeyPool(size=KEY_POOL_SIZE, bits=2048, e=65537, path=KEY_POOL_PATH)
         self.load_existing_keys()
 
     def load_existing_keys(self):
@@ -86,15 +88,20 @@ class MainApp:
         print(f"\nВыбранная опция: {self.console_menu.options[option]}")
 
         if option == 0:
-            key_rsa_encrypt = generateKeyPair(bits=2048, e=65537)
-            key_rsa_sign = generateKeyPair(bits=2048, e=65537)
-            # save keys to files
-            path1 = save_key_to_file(ALICE_PUBLIC_KEY_PATH, key_rsa_encrypt.to_public_pem())
-            path2 = save_key_to_file(ALICE_SIGN_PRIVATE_KEY_PATH, key_rsa_sign.to_private_pem())
-            path3 = save_key_to_file(ALICE_PRIVATE_KEY_PATH, key_rsa_encrypt.to_private_pem())
-            path4 = save_key_to_file(ALICE_SIGN_PUBLIC_KEY_PATH, key_rsa_sign.to_public_pem())
-            self.load_existing_keys()
-            self.buffer = f"🔑  Keys generated and saved to:\n{path1}\n{path2}\n{path3}\n{path4}"
+            key_pairs = self.key_pool.take(2, timeout=KEY_POOL_WAIT)
+            if key_pairs is None:
+                stats = self.key_pool.stats()
+                self.buffer = (f"⏳  Keys still generating in the background ({stats.depth}/{stats.capacity} ready). "
+                               f"Please try again shortly.")
+            else:
+                key_rsa_encrypt, key_rsa_sign = key_pairs
+                # save keys to files
+                path1 = save_key_to_file(ALICE_PUBLIC_KEY_PATH, key_rsa_encrypt.to_public_pem())
+                path2 = save_key_to_file(ALICE_SIGN_PRIVATE_KEY_PATH, key_rsa_sign.to_private_pem())
+                path3 = save_key_to_file(ALICE_PRIVATE_KEY_PATH, key_rsa_encrypt.to_private_pem())
+                path4 = save_key_to_file(ALICE_SIGN_PUBLIC_KEY_PATH, key_rsa_sign.to_public_pem())
+                self.load_existing_keys()
+                self.buffer = f"🔑  Keys generated and saved to:\n{path1}\n{path2}\n{path3}\n{path4}"
 
         if option == 1:
             if not all([self.private_key_pem_Alice, self.public_key_pem_Alice, self.private_sign_key_pem_Alice, self.public_sign_key_pem_Alice]):
@@ -259,7 +266,7 @@ class MainApp:
                         self.show_console(session=2)
                 except socket.timeout:
                     continue
-                except SignatureError as e:
+                except (SignatureError, SessionError, ValueError) as e:
                     self.buffer = f"Error: {e}\n" + self.buffer
                     self.show_console(session=2)
                     